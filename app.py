@@ -1,17 +1,11 @@
 import streamlit as st
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.datavalidation import DataValidation
-import pandas as pd
-import numpy as np
-import pyomo.environ as pyo
-from pyomo.opt import SolverFactory, TerminationCondition
 from pathlib import Path
 import json
 from datetime import datetime
 import tempfile
 import io
+import hashlib
+import pickle
 
 # ================================================================
 # PAGE CONFIGURATION
@@ -68,6 +62,32 @@ st.markdown("""
         font-weight: 700 !important;
     }
     
+    .metric-grid {
+        display: grid;
+        gap: 0.5rem;
+        margin-bottom: 1rem;
+    }
+    
+    .metric-card {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        padding: 1rem;
+        border-radius: 10px;
+        color: white;
+        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+    }
+    
+    .metric-label {
+        color: rgba(255,255,255,0.9);
+        font-size: 0.875rem;
+        font-weight: 600;
+    }
+    
+    .metric-value {
+        color: white;
+        font-size: 2rem;
+        font-weight: 700;
+    }
+    
     section[data-testid="stSidebar"] {
         background: linear-gradient(180deg, #f8f9fa 0%, #e9ecef 100%);
     }
@@ -118,60 +138,211 @@ if 'current_step' not in st.session_state:
 # EXCEL TEMPLATE GENERATOR - COMPLETE
 # ================================================================
 
+# Configuration-sheet rows as (label, key); the reader walks the same tuples in the same order
+_PARSIMONY_SCHEMA = (
+    ("Target Minimum (ω)", 'omega'),
+    ("Target Maximum (ζ)", 'zeta'),
+)
+
+_THRESHOLD_SCHEMA = (
+    ("Step 1: Completeness (α)", 'alpha'),
+    ("Step 3: Measurability Objective (γ_O)", 'gamma_O'),
+    ("Step 3: Measurability Subjective (γ_S)", 'gamma_S'),
+    ("Step 4: Distinctiveness (δ)", 'delta'),
+    ("Step 6: Sensitivity (θ)", 'theta'),
+    ("Step 7: Cost-effectiveness Objective (τ_O)", 'tau_O'),
+    ("Step 7: Cost-effectiveness Subjective (τ_S)", 'tau_S'),
+    ("Step 8: Alignment (λ)", 'lambda'),
+    ("Step 9: Cognitive Coherence (μ)", 'mu'),
+)
+
+@st.cache_resource
+def _template_styles():
+    """Template style objects, built once per process (openpyxl styles are immutable and shareable)"""
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    
+    thin = Side(style='thin')
+    return {
+        'header_fill': PatternFill(start_color="FF4472C4", end_color="FF4472C4", fill_type="solid"),
+        'input_fill': PatternFill(start_color="FFFFF2CC", end_color="FFFFF2CC", fill_type="solid"),
+        'output_fill': PatternFill(start_color="FFE2EFDA", end_color="FFE2EFDA", fill_type="solid"),
+        'section_fill': PatternFill(start_color="FFB4C7E7", end_color="FFB4C7E7", fill_type="solid"),
+        'header_font': Font(bold=True, color="FFFFFFFF", size=11),
+        'title_font': Font(bold=True, size=14),
+        'section_font': Font(bold=True, size=12),
+        'bold_font': Font(bold=True),
+        'thin_border': Border(left=thin, right=thin, top=thin, bottom=thin),
+        'center': Alignment(horizontal='center'),
+        'center_wrap': Alignment(horizontal='center', wrap_text=True),
+    }
+
+# Immutable bytes are safe to share, and cache_resource hands back the stored object
+# instead of unpickling a fresh copy of the workbook on every hit like cache_data
+@st.cache_resource(show_spinner=False, max_entries=32)
 def generate_excel_template(num_criteria, num_alternatives, num_experts, num_objectives,
                            omega, zeta, alpha, gamma_O, gamma_S, delta, theta,
                            tau_O, tau_S, lambda_th, mu):
-    """Generate complete Excel template with all 11 sheets"""
-    
-    st.session_state.config = {
-        'num_criteria': num_criteria,
-        'num_alternatives': num_alternatives,
-        'num_experts': num_experts,
-        'num_objectives': num_objectives,
-        'omega': omega,
-        'zeta': zeta,
-        'alpha': alpha,
-        'gamma_O': gamma_O,
-        'gamma_S': gamma_S,
-        'delta': delta,
-        'theta': theta,
-        'tau_O': tau_O,
-        'tau_S': tau_S,
-        'lambda': lambda_th,
-        'mu': mu
+    """Generate complete Excel template with all 11 sheets (cached per configuration)"""
+    
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import NamedStyle
+    from openpyxl.styles.borders import DEFAULT_BORDER
+    from openpyxl.styles.fonts import DEFAULT_FONT
+    from openpyxl.utils import get_column_letter
+    from openpyxl.worksheet.cell_range import CellRange
+    from openpyxl.worksheet.datavalidation import DataValidation
+    from openpyxl.writer.excel import ExcelWriter
+    from zipfile import ZipFile, ZIP_DEFLATED
+    from itertools import permutations
+    
+    S = _template_styles()
+    
+    settings = {
+        'omega': omega, 'zeta': zeta, 'alpha': alpha, 'gamma_O': gamma_O, 'gamma_S': gamma_S,
+        'delta': delta, 'theta': theta, 'tau_O': tau_O, 'tau_S': tau_S, 'lambda': lambda_th, 'mu': mu,
     }
     
     CRITERIA_START_ROW = 11
     ALTERNATIVES_START_ROW = 11 + num_criteria + 3
     OBJECTIVES_START_ROW = ALTERNATIVES_START_ROW + num_alternatives + 3
     
-    wb = openpyxl.Workbook()
-    wb.remove(wb.active)
+    # Cross-sheet references repeat on every sheet, so each string is built once
+    criterion_labels = [f"C{c+1}" for c in range(num_criteria)]
+    alternative_labels = [f"A{a+1}" for a in range(num_alternatives)]
+    objective_labels = [f"O{o+1}" for o in range(num_objectives)]
+    expert_labels = [f"Expert {e+1}" for e in range(num_experts)]
+    criterion_refs = [f'=0_Configuration!$B${CRITERIA_START_ROW + c}' for c in range(num_criteria)]
+    alternative_refs = [f'=0_Configuration!$B${ALTERNATIVES_START_ROW + 1 + a}' for a in range(num_alternatives)]
+    type_refs = [f'=2_Objectivity!$H${5 + c}' for c in range(num_criteria)]
+    
+    # Column letters for every column any sheet can reach, indexed 1-based like openpyxl
+    max_col = 2 + max(num_experts * num_experts, num_criteria, num_objectives) + 10
+    COLS = [None] + [get_column_letter(i) for i in range(1, max_col + 1)]
+    
+    wb = openpyxl.Workbook(write_only=True)
+    
+    # Every cell format the template uses is a named style: it is stored once in styles.xml,
+    # shows up in Excel's cell style gallery, and cells pick it up by name
+    for style in (
+        NamedStyle(name='header_cell', font=S['header_font'], fill=S['header_fill'],
+                   border=S['thin_border'], alignment=S['center']),
+        NamedStyle(name='header_wrap_cell', font=S['header_font'], fill=S['header_fill'],
+                   border=S['thin_border'], alignment=S['center_wrap']),
+        NamedStyle(name='input_cell', font=DEFAULT_FONT, fill=S['input_fill'], border=S['thin_border']),
+        NamedStyle(name='output_cell', font=DEFAULT_FONT, fill=S['output_fill'], border=S['thin_border']),
+        NamedStyle(name='output_decimal_cell', font=DEFAULT_FONT, fill=S['output_fill'],
+                   border=S['thin_border'], number_format='0.00'),
+        NamedStyle(name='reference_cell', font=DEFAULT_FONT, border=S['thin_border']),
+        NamedStyle(name='section_cell', font=S['section_font'], fill=S['section_fill'], border=DEFAULT_BORDER),
+        NamedStyle(name='title_text', font=S['title_font'], border=DEFAULT_BORDER),
+        NamedStyle(name='section_text', font=S['section_font'], border=DEFAULT_BORDER),
+        NamedStyle(name='bold_text', font=S['bold_font'], border=DEFAULT_BORDER),
+    ):
+        wb.add_named_style(style)
+    
+    def styled_cell(ws, value=None, style='Normal'):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+    
+    def column_widths(ws, widths):
+        """Set column widths from {first_col_idx: (last_col_idx, width)}, one <col> element per range"""
+        for first, (last, width) in widths.items():
+            dim = ws.column_dimensions[COLS[first]]
+            dim.width = width
+            dim.min, dim.max = first, last
+    
+    def merge_across(ws, row, first_col=1, last_col=4):
+        ws.merged_cells.add(CellRange(min_col=first_col, min_row=row, max_col=last_col, max_row=row))
+    
+    def header_row(ws, headers, style='header_cell'):
+        return [styled_cell(ws, header, style=style) for header in headers]
+    
+    def input_cells(ws, count):
+        return [styled_cell(ws, style='input_cell') for _ in range(count)]
+    
+    def add_rating_sheet(sheet_name, title, note, derived_columns, input_headers=None,
+                         col_width=12, header_style='header_cell'):
+        """Criterion x rater sheet; derived_columns are (header, formula(r, inputs, cols), style)"""
+        if input_headers is None:
+            input_headers = expert_labels
+        num_inputs = len(input_headers)
+        
+        ws = wb.create_sheet(sheet_name)
+        column_widths(ws, {1: (1, 12), 2: (2, 30), 3: (2 + num_inputs + len(derived_columns), col_width)})
+        
+        ws.append([styled_cell(ws, title, style='section_text')])
+        ws.append([note])
+        ws.append([])
+        
+        headers = ["Criterion ID", "Criterion Name"] + input_headers + [header for header, _, _ in derived_columns]
+        ws.append(header_row(ws, headers, header_style))
+        
+        first_col = COLS[3]
+        last_col = COLS[2 + num_inputs]
+        cols = [COLS[3 + num_inputs + k] for k in range(len(derived_columns))]
+        
+        for i in range(num_criteria):
+            row_num = 5 + i
+            inputs = f"{first_col}{row_num}:{last_col}{row_num}"
+            cells = [
+                criterion_labels[i],
+                styled_cell(ws, criterion_refs[i], style='reference_cell'),
+            ]
+            cells.extend(input_cells(ws, num_inputs))
+            for _, formula, output_style in derived_columns:
+                cells.append(styled_cell(ws, formula(row_num, inputs, cols), style=output_style))
+            ws.append(cells)
+    
+    def add_matrix_sheet(sheet_name, title, notes, block_title, row_label, row_refs, col_labels, extra_cols=0):
+        """One input matrix per expert; returns the sheet, each block's first data row and the next free row"""
+        ws = wb.create_sheet(sheet_name)
+        column_widths(ws, {1: (1, 35), 2: (1 + len(col_labels) + extra_cols, 10)})
+        
+        ws.append([styled_cell(ws, title, style='section_text')])
+        for note in notes:
+            ws.append([note] if note is not None else [])
+        ws.append([])
+        
+        headers = [row_label] + col_labels
+        row = 3 + len(notes)
+        data_rows = []
+        
+        for e in range(num_experts):
+            ws.append([styled_cell(ws, f"{expert_labels[e]} {block_title}", style='bold_text')])
+            ws.append(header_row(ws, headers))
+            data_rows.append(row + 2)
+            
+            for ref in row_refs:
+                cells = [styled_cell(ws, ref, style='reference_cell')]
+                cells.extend(input_cells(ws, len(col_labels)))
+                ws.append(cells)
+            
+            ws.append([])
+            ws.append([])
+            row += 2 + len(row_refs) + 2
+        
+        return ws, data_rows, row
     
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    input_fill = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
-    output_fill = PatternFill(start_color="E2EFDA", end_color="E2EFDA", fill_type="solid")
-    section_fill = PatternFill(start_color="B4C7E7", end_color="B4C7E7", fill_type="solid")
+    median_column = ("Median", lambda r, inputs, cols: f'=MEDIAN({inputs})', 'output_decimal_cell')
+    type_column = ("Type", lambda r, inputs, cols: type_refs[r - 5], 'output_cell')
     
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
+    def status_column(threshold):
+        return ("Status", lambda r, inputs, cols: f'=IF({cols[0]}{r}>={threshold},"Meets","Below")', 'output_cell')
     
     # SHEET 0: CONFIGURATION
+    # Write-only sheets stream rows in order, so column widths are set up front
     ws_config = wb.create_sheet("0_Configuration")
-    ws_config['A1'] = "MCDM CRITERIA SELECTION - CONFIGURATION"
-    ws_config['A1'].font = Font(bold=True, size=14)
-    ws_config.merge_cells('A1:D1')
+    column_widths(ws_config, {1: (1, 40), 2: (3, 20), 4: (4, 30)})
+    
+    ws_config.append([styled_cell(ws_config, "MCDM CRITERIA SELECTION - CONFIGURATION", style='title_text')])
+    merge_across(ws_config, 1)
+    ws_config.append([])
     
     row = 3
-    ws_config[f'A{row}'] = "PROBLEM STRUCTURE"
-    ws_config[f'A{row}'].font = Font(bold=True, size=12)
-    ws_config[f'A{row}'].fill = section_fill
-    ws_config.merge_cells(f'A{row}:D{row}')
+    ws_config.append([styled_cell(ws_config, "PROBLEM STRUCTURE", style='section_cell')])
+    merge_across(ws_config, row)
     row += 1
     
     structure_data = [
@@ -182,750 +353,338 @@ def generate_excel_template(num_criteria, num_alternatives, num_experts, num_obj
     ]
     
     for label, value in structure_data:
-        ws_config[f'A{row}'] = label
-        ws_config[f'B{row}'] = value
+        ws_config.append([label, value])
         row += 1
     
+    ws_config.append([])
     row += 1
     
-    ws_config[f'A{row}'] = "CRITERIA DEFINITIONS (Fill in the yellow cells)"
-    ws_config[f'A{row}'].font = Font(bold=True, size=12)
-    ws_config[f'A{row}'].fill = section_fill
-    ws_config.merge_cells(f'A{row}:D{row}')
+    ws_config.append([styled_cell(ws_config, "CRITERIA DEFINITIONS (Fill in the yellow cells)", style='section_cell')])
+    merge_across(ws_config, row)
     row += 1
     
     headers = ["Criterion ID", "Criterion Name", "Type (Cost/Benefit)", "Description (Optional)"]
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws_config.cell(row=row, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center', wrap_text=True)
-        cell.border = thin_border
+    ws_config.append(header_row(ws_config, headers))
     row += 1
     
     for i in range(num_criteria):
-        ws_config.cell(row=row, column=1, value=f"C{i+1}")
-        name_cell = ws_config.cell(row=row, column=2, value=f"Criterion {i+1}")
-        name_cell.fill = input_fill
-        name_cell.border = thin_border
-        type_cell = ws_config.cell(row=row, column=3, value="Benefit")
-        type_cell.fill = input_fill
-        type_cell.border = thin_border
-        desc_cell = ws_config.cell(row=row, column=4, value="")
-        desc_cell.fill = input_fill
-        desc_cell.border = thin_border
+        ws_config.append([
+            criterion_labels[i],
+            styled_cell(ws_config, f"Criterion {i+1}", style='input_cell'),
+            styled_cell(ws_config, "Benefit", style='input_cell'),
+            styled_cell(ws_config, "", style='input_cell'),
+        ])
         row += 1
     
-    dv = DataValidation(type="list", formula1='"Cost,Benefit"', allow_blank=False)
-    ws_config.add_data_validation(dv)
+    # showDropDown=False is what makes Excel show the in-cell arrow (the flag is inverted in OOXML)
     type_range = f"C{CRITERIA_START_ROW}:C{CRITERIA_START_ROW + num_criteria - 1}"
-    dv.add(type_range)
+    ws_config.data_validations.append(DataValidation(type="list", formula1='"Cost,Benefit"', allow_blank=False,
+                                                     showDropDown=False, sqref=type_range))
     
+    ws_config.append([])
     row += 1
     
-    ws_config[f'A{row}'] = "ALTERNATIVES DEFINITIONS (Fill in the yellow cells)"
-    ws_config[f'A{row}'].font = Font(bold=True, size=12)
-    ws_config[f'A{row}'].fill = section_fill
-    ws_config.merge_cells(f'A{row}:D{row}')
+    ws_config.append([styled_cell(ws_config, "ALTERNATIVES DEFINITIONS (Fill in the yellow cells)", style='section_cell')])
+    merge_across(ws_config, row)
     row += 1
     
     headers = ["Alternative ID", "Alternative Name", "Description (Optional)"]
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws_config.cell(row=row, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center', wrap_text=True)
-        cell.border = thin_border
+    ws_config.append(header_row(ws_config, headers))
     row += 1
     
     for i in range(num_alternatives):
-        ws_config.cell(row=row, column=1, value=f"A{i+1}")
-        name_cell = ws_config.cell(row=row, column=2, value=f"Alternative {i+1}")
-        name_cell.fill = input_fill
-        name_cell.border = thin_border
-        desc_cell = ws_config.cell(row=row, column=3, value="")
-        desc_cell.fill = input_fill
-        desc_cell.border = thin_border
+        ws_config.append([
+            alternative_labels[i],
+            styled_cell(ws_config, f"Alternative {i+1}", style='input_cell'),
+            styled_cell(ws_config, "", style='input_cell'),
+        ])
         row += 1
     
+    ws_config.append([])
     row += 1
     
-    ws_config[f'A{row}'] = "OBJECTIVES DEFINITIONS (Fill in the yellow cells)"
-    ws_config[f'A{row}'].font = Font(bold=True, size=12)
-    ws_config[f'A{row}'].fill = section_fill
-    ws_config.merge_cells(f'A{row}:D{row}')
+    ws_config.append([styled_cell(ws_config, "OBJECTIVES DEFINITIONS (Fill in the yellow cells)", style='section_cell')])
+    merge_across(ws_config, row)
     row += 1
     
     headers = ["Objective ID", "Objective Name", "Description (Optional)"]
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws_config.cell(row=row, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center', wrap_text=True)
-        cell.border = thin_border
+    ws_config.append(header_row(ws_config, headers))
     row += 1
     
     for i in range(num_objectives):
-        ws_config.cell(row=row, column=1, value=f"O{i+1}")
-        name_cell = ws_config.cell(row=row, column=2, value=f"Objective {i+1}")
-        name_cell.fill = input_fill
-        name_cell.border = thin_border
-        desc_cell = ws_config.cell(row=row, column=3, value="")
-        desc_cell.fill = input_fill
-        desc_cell.border = thin_border
+        ws_config.append([
+            objective_labels[i],
+            styled_cell(ws_config, f"Objective {i+1}", style='input_cell'),
+            styled_cell(ws_config, "", style='input_cell'),
+        ])
         row += 1
     
+    ws_config.append([])
+    ws_config.append([])
     row += 2
     
-    ws_config[f'A{row}'] = "PARSIMONY BOUNDS (Step 5)"
-    ws_config[f'A{row}'].font = Font(bold=True, size=12)
-    ws_config[f'A{row}'].fill = section_fill
-    ws_config.merge_cells(f'A{row}:D{row}')
+    ws_config.append([styled_cell(ws_config, "PARSIMONY BOUNDS (Step 5)", style='section_cell')])
+    merge_across(ws_config, row)
     row += 1
     
-    parsimony_data = [
-        ["Target Minimum (ω)", omega],
-        ["Target Maximum (ζ)", zeta],
-    ]
-    
-    for label, value in parsimony_data:
-        ws_config[f'A{row}'] = label
-        ws_config[f'B{row}'] = value
+    for label, key in _PARSIMONY_SCHEMA:
+        ws_config.append([label, settings[key]])
         row += 1
     
+    ws_config.append([])
     row += 1
     
-    ws_config[f'A{row}'] = "THRESHOLDS"
-    ws_config[f'A{row}'].font = Font(bold=True, size=12)
-    ws_config[f'A{row}'].fill = section_fill
-    ws_config.merge_cells(f'A{row}:D{row}')
+    ws_config.append([styled_cell(ws_config, "THRESHOLDS", style='section_cell')])
+    merge_across(ws_config, row)
     row += 1
     
-    threshold_data = [
-        ["Step 1: Completeness (α)", alpha],
-        ["Step 3: Measurability Objective (γ_O)", gamma_O],
-        ["Step 3: Measurability Subjective (γ_S)", gamma_S],
-        ["Step 4: Distinctiveness (δ)", delta],
-        ["Step 6: Sensitivity (θ)", theta],
-        ["Step 7: Cost-effectiveness Objective (τ_O)", tau_O],
-        ["Step 7: Cost-effectiveness Subjective (τ_S)", tau_S],
-        ["Step 8: Alignment (λ)", lambda_th],
-        ["Step 9: Cognitive Coherence (μ)", mu],
-    ]
-    
-    for label, value in threshold_data:
-        ws_config[f'A{row}'] = label
-        ws_config[f'B{row}'] = value
+    for label, key in _THRESHOLD_SCHEMA:
+        ws_config.append([label, settings[key]])
         row += 1
     
-    ws_config.column_dimensions['A'].width = 40
-    ws_config.column_dimensions['B'].width = 20
-    ws_config.column_dimensions['C'].width = 20
-    ws_config.column_dimensions['D'].width = 30
-    
     # SHEET 1: COMPLETENESS
-    ws1 = wb.create_sheet("1_Completeness")
-    ws1['A1'] = "Step 1: Completeness Evaluation"
-    ws1['A1'].font = Font(bold=True, size=12)
-    ws1['A2'] = f"Rate how well each criterion covers the decision aspect (1-10 scale). Threshold: α = {alpha}"
-    
-    row = 4
-    headers = ["Criterion ID", "Criterion Name"]
-    for e in range(num_experts):
-        headers.append(f"Expert {e+1}")
-    headers.extend(["Median", "Status"])
-    
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws1.cell(row=row, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = thin_border
-    
-    for i in range(num_criteria):
-        row_num = 5 + i
-        ws1.cell(row=row_num, column=1, value=f"C{i+1}")
-        name_cell = ws1.cell(row=row_num, column=2)
-        name_cell.value = f'=0_Configuration!$B${CRITERIA_START_ROW + i}'
-        name_cell.border = thin_border
-        
-        for e in range(num_experts):
-            cell = ws1.cell(row=row_num, column=3+e)
-            cell.fill = input_fill
-            cell.border = thin_border
-        
-        first_col = get_column_letter(3)
-        last_col = get_column_letter(2 + num_experts)
-        median_col = get_column_letter(3 + num_experts)
-        
-        median_cell = ws1.cell(row=row_num, column=3 + num_experts)
-        median_cell.value = f'=MEDIAN({first_col}{row_num}:{last_col}{row_num})'
-        median_cell.fill = output_fill
-        median_cell.border = thin_border
-        median_cell.number_format = '0.00'
-        
-        status_cell = ws1.cell(row=row_num, column=4 + num_experts)
-        status_cell.value = f'=IF({median_col}{row_num}>={alpha},"Meets","Below")'
-        status_cell.fill = output_fill
-        status_cell.border = thin_border
-    
-    ws1.column_dimensions['A'].width = 12
-    ws1.column_dimensions['B'].width = 30
-    for e in range(num_experts + 2):
-        ws1.column_dimensions[get_column_letter(3+e)].width = 12
+    add_rating_sheet(
+        "1_Completeness",
+        "Step 1: Completeness Evaluation",
+        f"Rate how well each criterion covers the decision aspect (1-10 scale). Threshold: α = {alpha}",
+        [median_column, status_column(alpha)]
+    )
     
     # SHEET 2: OBJECTIVITY
-    ws2 = wb.create_sheet("2_Objectivity")
-    ws2['A1'] = "Step 2: Objectivity/Subjectivity Classification"
-    ws2['A1'].font = Font(bold=True, size=12)
-    ws2['A2'] = "Classify each criterion: 1 = Objective, 0 = Subjective (Majority vote determines final classification)"
-    
-    row = 4
-    headers = ["Criterion ID", "Criterion Name"]
-    for e in range(num_experts):
-        headers.append(f"Expert {e+1}")
-    headers.extend(["Sum", "Final Class", "Binary"])
-    
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws2.cell(row=row, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = thin_border
-    
-    for i in range(num_criteria):
-        row_num = 5 + i
-        ws2.cell(row=row_num, column=1, value=f"C{i+1}")
-        name_cell = ws2.cell(row=row_num, column=2)
-        name_cell.value = f'=0_Configuration!$B${CRITERIA_START_ROW + i}'
-        name_cell.border = thin_border
-        
-        for e in range(num_experts):
-            cell = ws2.cell(row=row_num, column=3+e)
-            cell.fill = input_fill
-            cell.border = thin_border
-        
-        first_col = get_column_letter(3)
-        last_col = get_column_letter(2 + num_experts)
-        sum_col = get_column_letter(3 + num_experts)
-        
-        sum_cell = ws2.cell(row=row_num, column=3 + num_experts)
-        sum_cell.value = f'=SUM({first_col}{row_num}:{last_col}{row_num})'
-        sum_cell.fill = output_fill
-        sum_cell.border = thin_border
-        
-        class_col = get_column_letter(4 + num_experts)
-        class_cell = ws2.cell(row=row_num, column=4 + num_experts)
-        class_cell.value = f'=IF({sum_col}{row_num}>{num_experts}/2,"Objective","Subjective")'
-        class_cell.fill = output_fill
-        class_cell.border = thin_border
-        
-        binary_cell = ws2.cell(row=row_num, column=5 + num_experts)
-        binary_cell.value = f'=IF({class_col}{row_num}="Objective",1,0)'
-        binary_cell.fill = output_fill
-        binary_cell.border = thin_border
-    
-    ws2.column_dimensions['A'].width = 12
-    ws2.column_dimensions['B'].width = 30
-    for e in range(num_experts + 3):
-        ws2.column_dimensions[get_column_letter(3+e)].width = 12
+    add_rating_sheet(
+        "2_Objectivity",
+        "Step 2: Objectivity/Subjectivity Classification",
+        "Classify each criterion: 1 = Objective, 0 = Subjective (Majority vote determines final classification)",
+        [
+            ("Sum", lambda r, inputs, cols: f'=SUM({inputs})', 'output_cell'),
+            ("Final Class", lambda r, inputs, cols: f'=IF({cols[0]}{r}>{num_experts}/2,"Objective","Subjective")', 'output_cell'),
+            ("Binary", lambda r, inputs, cols: f'=IF({cols[1]}{r}="Objective",1,0)', 'output_cell'),
+        ]
+    )
     
     # SHEET 3: MEASURABILITY
-    ws3 = wb.create_sheet("3_Measurability")
-    ws3['A1'] = "Step 3: Measurability Assessment"
-    ws3['A1'].font = Font(bold=True, size=12)
-    ws3['A2'] = f"Rate how easily each criterion can be quantified (1-10 scale). Thresholds: γ_O = {gamma_O}, γ_S = {gamma_S}"
-    
-    row = 4
-    headers = ["Criterion ID", "Criterion Name"]
-    for e in range(num_experts):
-        headers.append(f"Expert {e+1}")
-    headers.extend(["Median", "Type", "Threshold γ_i", "Status"])
-    
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws3.cell(row=row, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = thin_border
-    
-    for i in range(num_criteria):
-        row_num = 5 + i
-        ws3.cell(row=row_num, column=1, value=f"C{i+1}")
-        name_cell = ws3.cell(row=row_num, column=2)
-        name_cell.value = f'=0_Configuration!$B${CRITERIA_START_ROW + i}'
-        name_cell.border = thin_border
-        
-        for e in range(num_experts):
-            cell = ws3.cell(row=row_num, column=3+e)
-            cell.fill = input_fill
-            cell.border = thin_border
-        
-        first_col = get_column_letter(3)
-        last_col = get_column_letter(2 + num_experts)
-        median_col = get_column_letter(3 + num_experts)
-        
-        median_cell = ws3.cell(row=row_num, column=3 + num_experts)
-        median_cell.value = f'=MEDIAN({first_col}{row_num}:{last_col}{row_num})'
-        median_cell.fill = output_fill
-        median_cell.border = thin_border
-        median_cell.number_format = '0.00'
-        
-        type_col = get_column_letter(4 + num_experts)
-        type_cell = ws3.cell(row=row_num, column=4 + num_experts)
-        type_cell.value = f'=2_Objectivity!$H${5 + i}'
-        type_cell.fill = output_fill
-        type_cell.border = thin_border
-        
-        thresh_col = get_column_letter(5 + num_experts)
-        thresh_cell = ws3.cell(row=row_num, column=5 + num_experts)
-        thresh_cell.value = f'=IF({type_col}{row_num}=1,{gamma_O},{gamma_S})'
-        thresh_cell.fill = output_fill
-        thresh_cell.border = thin_border
-        thresh_cell.number_format = '0.00'
-        
-        status_cell = ws3.cell(row=row_num, column=6 + num_experts)
-        status_cell.value = f'=IF({median_col}{row_num}>={thresh_col}{row_num},"Meets","Below")'
-        status_cell.fill = output_fill
-        status_cell.border = thin_border
-    
-    ws3.column_dimensions['A'].width = 12
-    ws3.column_dimensions['B'].width = 30
-    for e in range(num_experts + 4):
-        ws3.column_dimensions[get_column_letter(3+e)].width = 12
+    add_rating_sheet(
+        "3_Measurability",
+        "Step 3: Measurability Assessment",
+        f"Rate how easily each criterion can be quantified (1-10 scale). Thresholds: γ_O = {gamma_O}, γ_S = {gamma_S}",
+        [
+            median_column,
+            type_column,
+            ("Threshold γ_i", lambda r, inputs, cols: f'=IF({cols[1]}{r}=1,{gamma_O},{gamma_S})', 'output_decimal_cell'),
+            ("Status", lambda r, inputs, cols: f'=IF({cols[0]}{r}>={cols[2]}{r},"Meets","Below")', 'output_cell'),
+        ]
+    )
     
     # SHEET 4: DISTINCTIVENESS
-    ws4 = wb.create_sheet("4_Distinctiveness")
-    ws4['A1'] = "Step 4: Distinctiveness - Decision Matrices"
-    ws4['A1'].font = Font(bold=True, size=12)
-    ws4['A2'] = f"Provide decision matrices for each expert. Correlation threshold: δ = {delta}"
-    ws4['A3'] = "Note: Correlation analysis will be performed externally in Python"
-    
-    row = 5
-    for e in range(num_experts):
-        ws4.cell(row=row, column=1, value=f"Expert {e+1} Decision Matrix").font = Font(bold=True)
-        row += 1
-        
-        headers = ["Alternative"]
-        for c in range(num_criteria):
-            headers.append(f"C{c+1}")
-        
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws4.cell(row=row, column=col_idx, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal='center')
-            cell.border = thin_border
-        row += 1
-        
-        for a in range(num_alternatives):
-            alt_cell = ws4.cell(row=row, column=1)
-            alt_cell.value = f'=0_Configuration!$B${ALTERNATIVES_START_ROW + 1 + a}'
-            alt_cell.border = thin_border
-            
-            for c in range(num_criteria):
-                cell = ws4.cell(row=row, column=2+c)
-                cell.fill = input_fill
-                cell.border = thin_border
-            row += 1
-        
-        row += 2
-    
-    ws4.column_dimensions['A'].width = 35
-    for c in range(num_criteria):
-        ws4.column_dimensions[get_column_letter(2+c)].width = 10
+    add_matrix_sheet(
+        "4_Distinctiveness",
+        "Step 4: Distinctiveness - Decision Matrices",
+        [f"Provide decision matrices for each expert. Correlation threshold: δ = {delta}",
+         "Note: Correlation analysis will be performed externally in Python"],
+        "Decision Matrix",
+        "Alternative",
+        alternative_refs,
+        criterion_labels
+    )
     
     # SHEET 6: SENSITIVITY
-    ws6 = wb.create_sheet("6_Sensitivity")
-    ws6['A1'] = "Step 6: Sensitivity Analysis - Decision Matrices"
-    ws6['A1'].font = Font(bold=True, size=12)
-    ws6['A2'] = f"Provide decision matrices for each expert. Elasticity threshold: θ = {theta}"
-    ws6['A3'] = "Note: Sensitivity analysis will be performed externally in Python"
-    
-    row = 5
-    for e in range(num_experts):
-        ws6.cell(row=row, column=1, value=f"Expert {e+1} Decision Matrix").font = Font(bold=True)
-        row += 1
-        
-        headers = ["Alternative"]
-        for c in range(num_criteria):
-            headers.append(f"C{c+1}")
-        
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws6.cell(row=row, column=col_idx, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal='center')
-            cell.border = thin_border
-        row += 1
-        
-        for a in range(num_alternatives):
-            alt_cell = ws6.cell(row=row, column=1)
-            alt_cell.value = f'=0_Configuration!$B${ALTERNATIVES_START_ROW + 1 + a}'
-            alt_cell.border = thin_border
-            
-            for c in range(num_criteria):
-                cell = ws6.cell(row=row, column=2+c)
-                cell.fill = input_fill
-                cell.border = thin_border
-            row += 1
-        
-        row += 2
-    
-    ws6.column_dimensions['A'].width = 35
-    for c in range(num_criteria):
-        ws6.column_dimensions[get_column_letter(2+c)].width = 10
+    add_matrix_sheet(
+        "6_Sensitivity",
+        "Step 6: Sensitivity Analysis - Decision Matrices",
+        [f"Provide decision matrices for each expert. Elasticity threshold: θ = {theta}",
+         "Note: Sensitivity analysis will be performed externally in Python"],
+        "Decision Matrix",
+        "Alternative",
+        alternative_refs,
+        criterion_labels
+    )
     
     # SHEET 7: COST-EFFECTIVENESS
-    ws7 = wb.create_sheet("7_Cost_Effectiveness")
-    ws7['A1'] = "Step 7: Cost-Effectiveness Evaluation"
-    ws7['A1'].font = Font(bold=True, size=12)
-    ws7['A2'] = f"Rate cost-effectiveness (0-10 Likert scale). Thresholds: τ_O = {tau_O}, τ_S = {tau_S}"
-    
-    row = 4
-    headers = ["Criterion ID", "Criterion Name"]
-    for e in range(num_experts):
-        headers.append(f"Expert {e+1}")
-    headers.extend(["Median", "Type", "Threshold τ_i", "Status", "Binary"])
-    
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws7.cell(row=row, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = thin_border
-    
-    for i in range(num_criteria):
-        row_num = 5 + i
-        ws7.cell(row=row_num, column=1, value=f"C{i+1}")
-        name_cell = ws7.cell(row=row_num, column=2)
-        name_cell.value = f'=0_Configuration!$B${CRITERIA_START_ROW + i}'
-        name_cell.border = thin_border
-        
-        for e in range(num_experts):
-            cell = ws7.cell(row=row_num, column=3+e)
-            cell.fill = input_fill
-            cell.border = thin_border
-        
-        first_col = get_column_letter(3)
-        last_col = get_column_letter(2 + num_experts)
-        median_col = get_column_letter(3 + num_experts)
-        
-        median_cell = ws7.cell(row=row_num, column=3 + num_experts)
-        median_cell.value = f'=MEDIAN({first_col}{row_num}:{last_col}{row_num})'
-        median_cell.fill = output_fill
-        median_cell.border = thin_border
-        median_cell.number_format = '0.00'
-        
-        type_col = get_column_letter(4 + num_experts)
-        type_cell = ws7.cell(row=row_num, column=4 + num_experts)
-        type_cell.value = f'=2_Objectivity!$H${5 + i}'
-        type_cell.fill = output_fill
-        type_cell.border = thin_border
-        
-        thresh_col = get_column_letter(5 + num_experts)
-        thresh_cell = ws7.cell(row=row_num, column=5 + num_experts)
-        thresh_cell.value = f'=IF({type_col}{row_num}=1,{tau_O},{tau_S})'
-        thresh_cell.fill = output_fill
-        thresh_cell.border = thin_border
-        thresh_cell.number_format = '0.00'
-        
-        status_col = get_column_letter(6 + num_experts)
-        status_cell = ws7.cell(row=row_num, column=6 + num_experts)
-        status_cell.value = f'=IF({median_col}{row_num}>={thresh_col}{row_num},"Meets","Below")'
-        status_cell.fill = output_fill
-        status_cell.border = thin_border
-        
-        binary_cell = ws7.cell(row=row_num, column=7 + num_experts)
-        binary_cell.value = f'=IF({status_col}{row_num}="Meets",1,0)'
-        binary_cell.fill = output_fill
-        binary_cell.border = thin_border
-    
-    ws7.column_dimensions['A'].width = 12
-    ws7.column_dimensions['B'].width = 30
-    for e in range(num_experts + 5):
-        ws7.column_dimensions[get_column_letter(3+e)].width = 12
+    add_rating_sheet(
+        "7_Cost_Effectiveness",
+        "Step 7: Cost-Effectiveness Evaluation",
+        f"Rate cost-effectiveness (0-10 Likert scale). Thresholds: τ_O = {tau_O}, τ_S = {tau_S}",
+        [
+            median_column,
+            type_column,
+            ("Threshold τ_i", lambda r, inputs, cols: f'=IF({cols[1]}{r}=1,{tau_O},{tau_S})', 'output_decimal_cell'),
+            ("Status", lambda r, inputs, cols: f'=IF({cols[0]}{r}>={cols[2]}{r},"Meets","Below")', 'output_cell'),
+            ("Binary", lambda r, inputs, cols: f'=IF({cols[3]}{r}="Meets",1,0)', 'output_cell'),
+        ]
+    )
     
     # SHEET 8: ALIGNMENT
-    ws8 = wb.create_sheet("8_Alignment")
-    ws8['A1'] = "Step 8: Alignment Assessment"
-    ws8['A1'].font = Font(bold=True, size=12)
-    ws8['A2'] = f"Rate criterion-objective alignment (1-10 scale). Threshold: λ = {lambda_th}"
-    
-    row = 4
-    headers = ["Criterion ID", "Criterion Name"]
-    for e in range(num_experts):
-        headers.append(f"Expert {e+1}")
-    headers.extend(["Median", "Status"])
-    
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws8.cell(row=row, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = thin_border
-    
-    for i in range(num_criteria):
-        row_num = 5 + i
-        ws8.cell(row=row_num, column=1, value=f"C{i+1}")
-        name_cell = ws8.cell(row=row_num, column=2)
-        name_cell.value = f'=0_Configuration!$B${CRITERIA_START_ROW + i}'
-        name_cell.border = thin_border
-        
-        for e in range(num_experts):
-            cell = ws8.cell(row=row_num, column=3+e)
-            cell.fill = input_fill
-            cell.border = thin_border
-        
-        first_col = get_column_letter(3)
-        last_col = get_column_letter(2 + num_experts)
-        median_col = get_column_letter(3 + num_experts)
-        
-        median_cell = ws8.cell(row=row_num, column=3 + num_experts)
-        median_cell.value = f'=MEDIAN({first_col}{row_num}:{last_col}{row_num})'
-        median_cell.fill = output_fill
-        median_cell.border = thin_border
-        median_cell.number_format = '0.00'
-        
-        status_cell = ws8.cell(row=row_num, column=4 + num_experts)
-        status_cell.value = f'=IF({median_col}{row_num}>={lambda_th},"Meets","Below")'
-        status_cell.fill = output_fill
-        status_cell.border = thin_border
-    
-    ws8.column_dimensions['A'].width = 12
-    ws8.column_dimensions['B'].width = 30
-    for e in range(num_experts + 2):
-        ws8.column_dimensions[get_column_letter(3+e)].width = 12
+    add_rating_sheet(
+        "8_Alignment",
+        "Step 8: Alignment Assessment",
+        f"Rate criterion-objective alignment (1-10 scale). Threshold: λ = {lambda_th}",
+        [median_column, status_column(lambda_th)]
+    )
     
     # SHEET 9: COGNITIVE COHERENCE
-    ws9 = wb.create_sheet("9_Cognitive_Coherence")
-    ws9['A1'] = "Step 9: Cognitive Coherence"
-    ws9['A1'].font = Font(bold=True, size=12)
-    ws9['A2'] = f"Cross-expert ratings of definitions (no self-ratings). Threshold: μ = {mu}"
-    
-    row = 4
-    headers = ["Criterion ID", "Criterion Name"]
-    for rater in range(num_experts):
-        for author in range(num_experts):
-            if rater != author:
-                headers.append(f"E{rater+1}→E{author+1}")
-    headers.extend(["Median", "Status"])
-    
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws9.cell(row=row, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center', wrap_text=True)
-        cell.border = thin_border
-    
-    num_cross_ratings = num_experts * (num_experts - 1)
-    for i in range(num_criteria):
-        row_num = 5 + i
-        ws9.cell(row=row_num, column=1, value=f"C{i+1}")
-        name_cell = ws9.cell(row=row_num, column=2)
-        name_cell.value = f'=0_Configuration!$B${CRITERIA_START_ROW + i}'
-        name_cell.border = thin_border
-        
-        for j in range(num_cross_ratings):
-            cell = ws9.cell(row=row_num, column=3+j)
-            cell.fill = input_fill
-            cell.border = thin_border
-        
-        first_col = get_column_letter(3)
-        last_col = get_column_letter(2 + num_cross_ratings)
-        median_col = get_column_letter(3 + num_cross_ratings)
-        
-        median_cell = ws9.cell(row=row_num, column=3 + num_cross_ratings)
-        median_cell.value = f'=MEDIAN({first_col}{row_num}:{last_col}{row_num})'
-        median_cell.fill = output_fill
-        median_cell.border = thin_border
-        median_cell.number_format = '0.00'
-        
-        status_cell = ws9.cell(row=row_num, column=4 + num_cross_ratings)
-        status_cell.value = f'=IF({median_col}{row_num}>={mu},"Meets","Below")'
-        status_cell.fill = output_fill
-        status_cell.border = thin_border
-    
-    ws9.column_dimensions['A'].width = 12
-    ws9.column_dimensions['B'].width = 30
-    for j in range(num_cross_ratings + 2):
-        ws9.column_dimensions[get_column_letter(3+j)].width = 10
+    cross_headers = [f"E{rater+1}→E{author+1}" for rater, author in permutations(range(num_experts), 2)]
+    
+    add_rating_sheet(
+        "9_Cognitive_Coherence",
+        "Step 9: Cognitive Coherence",
+        f"Cross-expert ratings of definitions (no self-ratings). Threshold: μ = {mu}",
+        [median_column, status_column(mu)],
+        input_headers=cross_headers,
+        col_width=10,
+        header_style='header_wrap_cell'
+    )
     
     # SHEET 10: MONOTONE COHERENCE
-    ws10 = wb.create_sheet("10_Monotone_Coherence")
-    ws10['A1'] = "Step 10: Monotone Coherence"
-    ws10['A1'].font = Font(bold=True, size=12)
-    ws10['A2'] = "Binary votes on monotonicity (1 = monotone, 0 = not monotone)"
-    
-    row = 4
-    headers = ["Criterion ID", "Criterion Name"]
-    for e in range(num_experts):
-        headers.append(f"Expert {e+1}")
-    headers.extend(["q_i (unanimity)", "Status"])
-    
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws10.cell(row=row, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = thin_border
-    
-    for i in range(num_criteria):
-        row_num = 5 + i
-        ws10.cell(row=row_num, column=1, value=f"C{i+1}")
-        name_cell = ws10.cell(row=row_num, column=2)
-        name_cell.value = f'=0_Configuration!$B${CRITERIA_START_ROW + i}'
-        name_cell.border = thin_border
-        
-        for e in range(num_experts):
-            cell = ws10.cell(row=row_num, column=3+e)
-            cell.fill = input_fill
-            cell.border = thin_border
-        
-        first_col = get_column_letter(3)
-        last_col = get_column_letter(2 + num_experts)
-        q_col = get_column_letter(3 + num_experts)
-        
-        q_cell = ws10.cell(row=row_num, column=3 + num_experts)
-        q_cell.value = f'=PRODUCT({first_col}{row_num}:{last_col}{row_num})'
-        q_cell.fill = output_fill
-        q_cell.border = thin_border
-        
-        status_cell = ws10.cell(row=row_num, column=4 + num_experts)
-        status_cell.value = f'=IF({q_col}{row_num}=1,"Meets","Does not meet")'
-        status_cell.fill = output_fill
-        status_cell.border = thin_border
-    
-    ws10.column_dimensions['A'].width = 12
-    ws10.column_dimensions['B'].width = 30
-    for e in range(num_experts + 2):
-        ws10.column_dimensions[get_column_letter(3+e)].width = 12
+    add_rating_sheet(
+        "10_Monotone_Coherence",
+        "Step 10: Monotone Coherence",
+        "Binary votes on monotonicity (1 = monotone, 0 = not monotone)",
+        [
+            ("q_i (unanimity)", lambda r, inputs, cols:
+                f'=IF(COUNTA({inputs})={num_experts},IF(COUNTIF({inputs},0)=0,1,0),"")', 'output_cell'),
+            ("Status", lambda r, inputs, cols: f'=IF({cols[0]}{r}=1,"Meets","Does not meet")', 'output_cell'),
+        ]
+    )
     
     # SHEET 11: REPRESENTATIVENESS
-    ws11 = wb.create_sheet("11_Representativeness")
-    ws11['A1'] = "Step 11: Representativeness"
-    ws11['A1'].font = Font(bold=True, size=12)
-    ws11['A2'] = "Assign criteria to objectives (1 = assigned, 0 = not; max one per criterion per expert)"
-    
-    expert_data_rows = []
-    row = 5
-    
-    for e in range(num_experts):
-        ws11.cell(row=row, column=1, value=f"Expert {e+1} Assignments").font = Font(bold=True)
-        row += 1
-        
-        headers = ["Criterion"]
-        for o in range(num_objectives):
-            headers.append(f"O{o+1}")
-        
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws11.cell(row=row, column=col_idx, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal='center')
-            cell.border = thin_border
-        row += 1
-        
-        expert_start_row = row
-        expert_data_rows.append(expert_start_row)
-        
-        for c in range(num_criteria):
-            crit_cell = ws11.cell(row=row, column=1)
-            crit_cell.value = f'=0_Configuration!$B${CRITERIA_START_ROW + c}'
-            crit_cell.border = thin_border
-            
-            for o in range(num_objectives):
-                cell = ws11.cell(row=row, column=2+o)
-                cell.fill = input_fill
-                cell.border = thin_border
-            row += 1
-        
-        row += 2
+    ws11, expert_data_rows, row = add_matrix_sheet(
+        "11_Representativeness",
+        "Step 11: Representativeness",
+        ["Assign criteria to objectives (1 = assigned, 0 = not; max one per criterion per expert)", None],
+        "Assignments",
+        "Criterion",
+        criterion_refs,
+        objective_labels,
+        extra_cols=1
+    )
     
+    ws11.append([])
+    ws11.append([])
     row += 2
-    ws11.cell(row=row, column=1, value="CONSOLIDATED (Majority Vote)").font = Font(bold=True, size=12)
+    ws11.append([styled_cell(ws11, "CONSOLIDATED (Majority Vote)", style='section_text')])
+    ws11.append([])
     row += 2
     
-    headers = ["Criterion"]
-    for o in range(num_objectives):
-        headers.append(f"O{o+1}")
-    headers.append("e_i^{rp}")
+    headers = ["Criterion"] + objective_labels + ["e_i^{rp}"]
     
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws11.cell(row=row, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center')
-        cell.border = thin_border
+    ws11.append(header_row(ws11, headers))
     
-    for c in range(num_criteria):
-        row += 1
-        crit_cell = ws11.cell(row=row, column=1)
-        crit_cell.value = f'=0_Configuration!$B${CRITERIA_START_ROW + c}'
-        crit_cell.border = thin_border
-        
-        for o in range(num_objectives):
-            obj_col = get_column_letter(2 + o)
-            vote_refs = []
-            for e in range(num_experts):
-                expert_row = expert_data_rows[e] + c
-                vote_refs.append(f"{obj_col}{expert_row}")
-            
-            sum_formula = "+".join(vote_refs)
-            majority_formula = f'=IF({sum_formula}>{num_experts}/2,1,0)'
-            
-            cell = ws11.cell(row=row, column=2+o)
-            cell.value = majority_formula
-            cell.fill = output_fill
-            cell.border = thin_border
-        
-        first_obj_col = get_column_letter(2)
-        last_obj_col = get_column_letter(1 + num_objectives)
-        
-        e_rp_cell = ws11.cell(row=row, column=2 + num_objectives)
-        e_rp_cell.value = f'=MIN(1,SUM({first_obj_col}{row}:{last_obj_col}{row}))'
-        e_rp_cell.fill = output_fill
-        e_rp_cell.border = thin_border
+    first_obj_col = COLS[2]
+    last_obj_col = COLS[1 + num_objectives]
     
-    ws11.column_dimensions['A'].width = 35
-    for o in range(num_objectives + 1):
-        ws11.column_dimensions[get_column_letter(2+o)].width = 10
+    # Expert e's vote for criterion c sits on row expert_data_rows[e] + c, so each objective's
+    # majority formula is one template filled with the expert rows of the current criterion
+    vote_templates = [
+        "=IF(" + "+".join(f"{obj_col}{{{e}}}" for e in range(num_experts)) + f">{num_experts}/2,1,0)"
+        for obj_col in COLS[2:2 + num_objectives]
+    ]
     
+    for c in range(num_criteria):
+        row += 1
+        expert_rows = [start + c for start in expert_data_rows]
+        ws11.append(
+            [styled_cell(ws11, criterion_refs[c], style='reference_cell')]
+            + [styled_cell(ws11, template.format(*expert_rows), style='output_cell') for template in vote_templates]
+            + [styled_cell(ws11, f'=MIN(1,SUM({first_obj_col}{row}:{last_obj_col}{row}))', style='output_cell')]
+        )
+    
+    # wb.save() deflates at zlib's default level; the sheets are small, repetitive
+    # XML, so level 1 gives nearly the same size for a fraction of the CPU
     buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
+    archive = ZipFile(buffer, 'w', ZIP_DEFLATED, allowZip64=True, compresslevel=1)
+    ExcelWriter(wb, archive).save()
     
-    return buffer
+    return buffer.getvalue()
 
 
 # ================================================================
 # EXCEL READER - COMPLETE
 # ================================================================
 
+def _workbook_rows(file):
+    """Cached cell values of every sheet as row tuples, keyed by sheet title (empty cells are None)"""
+    try:
+        from python_calamine import CalamineError, CalamineWorkbook
+    except ImportError:
+        CalamineWorkbook = None
+    
+    if CalamineWorkbook is not None:
+        # calamine parses in Rust without building a Python object per cell. It reports empty cells
+        # as '' and every number as float, so both are mapped back to what openpyxl would return
+        def cell(value):
+            if value == '':
+                return None
+            if isinstance(value, float) and value.is_integer():
+                return int(value)
+            return value
+        
+        try:
+            wb = CalamineWorkbook.from_object(file)
+            return {name: [tuple(cell(v) for v in row)
+                           for row in wb.get_sheet_by_name(name).to_python(skip_empty_area=False)]
+                    for name in wb.sheet_names}
+        except CalamineError:
+            # A workbook calamine cannot parse may still open in openpyxl, so rewind and fall through
+            if hasattr(file, 'seek'):
+                file.seek(0)
+    
+    import openpyxl
+    
+    wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheets = {}
+        for ws in wb.worksheets:
+            ws.reset_dimensions()  # the stored <dimension> is not trustworthy for every writer
+            sheets[ws.title] = list(ws.values)
+        return sheets
+    finally:
+        wb.close()
+
+
 def read_mcdm_template(file):
     """Read filled MCDM Excel template"""
     
-    results = {}
+    import pandas as pd
+    import numpy as np
+    from itertools import islice
     
-    df_config = pd.read_excel(file, sheet_name='0_Configuration', header=None)
-    
-    def find_row_with_text(df, text):
-        for idx, row in df.iterrows():
-            if pd.notna(row[0]) and text.upper() in str(row[0]).upper():
-                return idx
-        return None
+    results = {}
     
-    num_criteria = int(df_config.iloc[3, 1])
-    num_alternatives = int(df_config.iloc[4, 1])
-    num_experts = int(df_config.iloc[5, 1])
-    num_objectives = int(df_config.iloc[6, 1])
+    # Parse the workbook once; every sheet is then sliced from its raw rows of cached values
+    sheets = _workbook_rows(file)
+    # Configuration rows padded to columns A:D; the configuration is only ever read cell by cell
+    config_rows = [tuple(row[:4]) + (None,) * (4 - len(row)) for row in sheets.pop('0_Configuration')]
+    
+    def step_column(sheet_name, col):
+        """Per-criterion column of a step sheet (header on row 4, criteria from row 5)"""
+        rows = islice(sheets[sheet_name], 4, 4 + num_criteria)
+        return np.array([row[col] if col < len(row) else None for row in rows])
+    
+    def text(value):
+        return '' if value is None else str(value)
+    
+    # One scan of column A records the first row each section title appears on
+    section_titles = ("CRITERIA DEFINITIONS", "ALTERNATIVES DEFINITIONS", "OBJECTIVES DEFINITIONS",
+                      "PARSIMONY", "THRESHOLDS")
+    header_rows = {}
+    for idx, row in enumerate(config_rows):
+        if row[0] is not None:
+            label = str(row[0]).upper()
+            for title in section_titles:
+                if title in label and title not in header_rows:
+                    header_rows[title] = idx
+    
+    num_criteria = int(config_rows[3][1])
+    num_alternatives = int(config_rows[4][1])
+    num_experts = int(config_rows[5][1])
+    num_objectives = int(config_rows[6][1])
     
     results['num_criteria'] = num_criteria
     results['num_alternatives'] = num_alternatives
     results['num_experts'] = num_experts
     results['num_objectives'] = num_objectives
     
-    criteria_header_row = find_row_with_text(df_config, "CRITERIA DEFINITIONS")
+    criteria_header_row = header_rows["CRITERIA DEFINITIONS"]
     criteria_start_row = criteria_header_row + 2
     criteria_ids = []
     criteria_names = []
@@ -933,204 +692,145 @@ def read_mcdm_template(file):
     
     for i in range(num_criteria):
         row_idx = criteria_start_row + i
-        criteria_ids.append(str(df_config.iloc[row_idx, 0]))
-        criteria_names.append(str(df_config.iloc[row_idx, 1]))
-        criteria_types.append(str(df_config.iloc[row_idx, 2]))
+        criteria_ids.append(text(config_rows[row_idx][0]))
+        criteria_names.append(text(config_rows[row_idx][1]))
+        criteria_types.append(text(config_rows[row_idx][2]))
     
     results['criteria_ids'] = criteria_ids
     results['criteria_names'] = criteria_names
     results['criteria_types'] = criteria_types
     
-    alternatives_header_row = find_row_with_text(df_config, "ALTERNATIVES DEFINITIONS")
+    alternatives_header_row = header_rows["ALTERNATIVES DEFINITIONS"]
     alternatives_start_row = alternatives_header_row + 2
     alternatives_ids = []
     alternatives_names = []
     
     for i in range(num_alternatives):
         row_idx = alternatives_start_row + i
-        alternatives_ids.append(str(df_config.iloc[row_idx, 0]))
-        alternatives_names.append(str(df_config.iloc[row_idx, 1]))
+        alternatives_ids.append(text(config_rows[row_idx][0]))
+        alternatives_names.append(text(config_rows[row_idx][1]))
     
     results['alternatives_ids'] = alternatives_ids
     results['alternatives_names'] = alternatives_names
     
-    objectives_header_row = find_row_with_text(df_config, "OBJECTIVES DEFINITIONS")
+    objectives_header_row = header_rows["OBJECTIVES DEFINITIONS"]
     objectives_start_row = objectives_header_row + 2
     objectives_ids = []
     objectives_names = []
     
     for i in range(num_objectives):
         row_idx = objectives_start_row + i
-        objectives_ids.append(str(df_config.iloc[row_idx, 0]))
-        objectives_names.append(str(df_config.iloc[row_idx, 1]))
+        objectives_ids.append(text(config_rows[row_idx][0]))
+        objectives_names.append(text(config_rows[row_idx][1]))
     
     results['objectives_ids'] = objectives_ids
     results['objectives_names'] = objectives_names
     
-    parsimony_header_row = find_row_with_text(df_config, "PARSIMONY")
+    parsimony_header_row = header_rows["PARSIMONY"]
     parsimony_start_row = parsimony_header_row + 1
-    results['omega'] = int(df_config.iloc[parsimony_start_row, 1])
-    results['zeta'] = int(df_config.iloc[parsimony_start_row + 1, 1])
+    for offset, (_, key) in enumerate(_PARSIMONY_SCHEMA):
+        results[key] = int(config_rows[parsimony_start_row + offset][1])
     
-    thresholds_header_row = find_row_with_text(df_config, "THRESHOLDS")
+    thresholds_header_row = header_rows["THRESHOLDS"]
     thresholds_start_row = thresholds_header_row + 1
-    results['alpha'] = float(df_config.iloc[thresholds_start_row, 1])
-    results['gamma_O'] = float(df_config.iloc[thresholds_start_row + 1, 1])
-    results['gamma_S'] = float(df_config.iloc[thresholds_start_row + 2, 1])
-    results['delta'] = float(df_config.iloc[thresholds_start_row + 3, 1])
-    results['theta'] = float(df_config.iloc[thresholds_start_row + 4, 1])
-    results['tau_O'] = float(df_config.iloc[thresholds_start_row + 5, 1])
-    results['tau_S'] = float(df_config.iloc[thresholds_start_row + 6, 1])
-    results['lambda'] = float(df_config.iloc[thresholds_start_row + 7, 1])
-    results['mu'] = float(df_config.iloc[thresholds_start_row + 8, 1])
-    
-    df_comp = pd.read_excel(file, sheet_name='1_Completeness', skiprows=3, header=0)
-    median_col_name = df_comp.columns[2 + num_experts]
-    c_values = df_comp[median_col_name].head(num_criteria).tolist()
+    for offset, (_, key) in enumerate(_THRESHOLD_SCHEMA):
+        results[key] = float(config_rows[thresholds_start_row + offset][1])
+    
+    c_values = step_column('1_Completeness', 2 + num_experts).astype(float).tolist()
     results['c_values'] = c_values
     
-    df_obj = pd.read_excel(file, sheet_name='2_Objectivity', skiprows=3, header=0)
-    binary_col_name = df_obj.columns[4 + num_experts]
-    u_values = df_obj[binary_col_name].head(num_criteria).astype(int).tolist()
+    u_values = step_column('2_Objectivity', 4 + num_experts).astype(int).tolist()
     results['u_values'] = u_values
     
-    df_meas = pd.read_excel(file, sheet_name='3_Measurability', skiprows=3, header=0)
-    median_col_name = df_meas.columns[2 + num_experts]
-    m_values = df_meas[median_col_name].head(num_criteria).tolist()
+    m_values = step_column('3_Measurability', 2 + num_experts).astype(float).tolist()
     results['m_values'] = m_values
     
-    df_dist = pd.read_excel(file, sheet_name='4_Distinctiveness', header=None)
+    def expert_matrices(df):
+        """Slice each expert's alternatives x criteria block out of a decision-matrix sheet"""
+        matrices = []
+        for e in range(num_experts):
+            data_start = 6 + e * (num_alternatives + 4)
+            block = df.iloc[data_start:data_start + num_alternatives, 1:1 + num_criteria].to_numpy(dtype=float)
+            matrices.append(np.nan_to_num(block, nan=0.0))
+        return matrices
     
-    decision_matrices = []
-    current_row = 4
+    df_dist = pd.DataFrame(sheets['4_Distinctiveness'])
     
-    for e in range(num_experts):
-        data_start = current_row + 2
-        matrix_data = []
-        for a in range(num_alternatives):
-            row_data = []
-            for c in range(num_criteria):
-                value = df_dist.iloc[data_start + a, 1 + c]
-                row_data.append(float(value) if pd.notna(value) else 0.0)
-            matrix_data.append(row_data)
-        
-        matrix_df = pd.DataFrame(matrix_data, columns=criteria_ids)
-        decision_matrices.append(matrix_df)
-        current_row = data_start + num_alternatives + 2
+    decision_matrices = expert_matrices(df_dist)
     
-    correlations = []
-    for matrix in decision_matrices:
-        corr_matrix = matrix.corr().abs()
-        correlations.append(corr_matrix.values)
+    # Constant columns give NaN correlations, as DataFrame.corr did, without the warning
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlations = [np.abs(np.atleast_2d(np.corrcoef(matrix, rowvar=False)))
+                        for matrix in decision_matrices]
     
-    stacked = np.stack(correlations, axis=2)
-    pooled_corr = np.median(stacked, axis=2)
+    stacked = np.stack(correlations)
+    pooled_corr = np.median(stacked, axis=0)
     results['r_mat'] = pooled_corr.tolist()
     
-    df_sens = pd.read_excel(file, sheet_name='6_Sensitivity', header=None)
+    df_sens = pd.DataFrame(sheets['6_Sensitivity'])
     
-    decision_matrices_sens = []
-    current_row = 4
+    decision_matrices_sens = expert_matrices(df_sens)
     
-    for e in range(num_experts):
-        data_start = current_row + 2
-        matrix_data = []
-        for a in range(num_alternatives):
-            row_data = []
-            for c in range(num_criteria):
-                value = df_sens.iloc[data_start + a, 1 + c]
-                row_data.append(float(value) if pd.notna(value) else 0.0)
-            matrix_data.append(row_data)
-        
-        matrix_df = pd.DataFrame(matrix_data, columns=criteria_ids)
-        decision_matrices_sens.append(matrix_df)
-        current_row = data_start + num_alternatives + 2
-    
-    def normalize_matrix(matrix, types):
-        norm = matrix.copy()
-        for idx, col in enumerate(matrix.columns):
-            max_val = matrix[col].max()
-            min_val = matrix[col].min()
-            if max_val == min_val:
-                norm[col] = 1.0
-            elif types[idx] == 'Benefit':
-                norm[col] = (matrix[col] - min_val) / (max_val - min_val)
-            else:
-                norm[col] = (max_val - matrix[col]) / (max_val - min_val)
-        return norm
-    
-    normalized_matrices = [normalize_matrix(m, criteria_types) for m in decision_matrices_sens]
+    # Min-max normalize every expert's columns at once; constant columns score 1
+    sens = np.stack(decision_matrices_sens)
+    col_max = sens.max(axis=1, keepdims=True)
+    col_min = sens.min(axis=1, keepdims=True)
+    col_range = col_max - col_min
+    is_benefit = np.array([t == 'Benefit' for t in criteria_types])
+    spread = np.where(is_benefit, sens - col_min, col_max - sens)
+    normalized = np.where(col_range == 0, 1.0, spread / np.where(col_range == 0, 1.0, col_range))
     
     num_simulations = 1000
     np.random.seed(42)
     random_weights = np.random.dirichlet(np.ones(num_criteria), num_simulations)
     
-    sensitivity_results = []
-    for norm_mat in normalized_matrices:
-        elasticities = []
-        for weights in random_weights:
-            scores = np.dot(norm_mat.values, weights)
-            total = scores.sum()
-            if total > 0:
-                elasticity = [(norm_mat.iloc[:, j] * weights[j]).sum() / total 
-                             for j in range(num_criteria)]
-            else:
-                elasticity = [0.0] * num_criteria
-            elasticities.append(elasticity)
-        
-        avg_elasticity = np.mean(elasticities, axis=0)
-        sensitivity_results.append(avg_elasticity)
+    # Criterion j's share of the total score under weights w is col_sums[j] * w[j] / (w @ col_sums),
+    # so every expert and simulation is evaluated at once as an (experts, simulations, criteria) array
+    col_sums = normalized.sum(axis=1)
+    totals = (col_sums @ random_weights.T)[:, :, None]
+    weighted = random_weights[None, :, :] * col_sums[:, None, :]
+    elasticities = np.divide(weighted, totals, out=np.zeros_like(weighted), where=totals > 0)
     
-    s_values = np.mean(sensitivity_results, axis=0).tolist()
+    s_values = elasticities.mean(axis=(0, 1)).tolist()
     results['s_values'] = s_values
     
-    df_cost = pd.read_excel(file, sheet_name='7_Cost_Effectiveness', skiprows=3, header=0)
-    median_col_name = df_cost.columns[2 + num_experts]
-    ce_values = df_cost[median_col_name].head(num_criteria).tolist()
+    ce_values = step_column('7_Cost_Effectiveness', 2 + num_experts).astype(float).tolist()
     results['ce_values'] = ce_values
     
-    df_align = pd.read_excel(file, sheet_name='8_Alignment', skiprows=3, header=0)
-    median_col_name = df_align.columns[2 + num_experts]
-    a_values = df_align[median_col_name].head(num_criteria).tolist()
+    a_values = step_column('8_Alignment', 2 + num_experts).astype(float).tolist()
     results['a_values'] = a_values
     
-    df_cog = pd.read_excel(file, sheet_name='9_Cognitive_Coherence', skiprows=3, header=0)
     num_cross_ratings = num_experts * (num_experts - 1)
-    median_col_name = df_cog.columns[2 + num_cross_ratings]
-    cc_values = df_cog[median_col_name].head(num_criteria).tolist()
+    cc_values = step_column('9_Cognitive_Coherence', 2 + num_cross_ratings).astype(float).tolist()
     results['cc_values'] = cc_values
     
-    df_mono = pd.read_excel(file, sheet_name='10_Monotone_Coherence', skiprows=3, header=0)
-    unanimity_col_name = df_mono.columns[2 + num_experts]
-    q_values = df_mono[unanimity_col_name].head(num_criteria).astype(int).tolist()
+    # q_i stays blank in the template until every expert has voted on criterion i
+    q_column = step_column('10_Monotone_Coherence', 2 + num_experts)
+    incomplete = [f"C{i + 1}" for i, value in enumerate(q_column) if value is None]
+    if incomplete:
+        raise ValueError(f"10_Monotone_Coherence: incomplete votes for {', '.join(incomplete)}")
+    q_values = q_column.astype(int).tolist()
     results['q_values'] = q_values
     
-    df_repr = pd.read_excel(file, sheet_name='11_Representativeness', header=None)
+    df_repr = pd.DataFrame(sheets['11_Representativeness'])
     
     consolidated_row = None
-    for idx, row in df_repr.iterrows():
-        if pd.notna(row[0]) and 'CONSOLIDATED' in str(row[0]).upper():
+    for idx, label in enumerate(df_repr.iloc[:, 0]):
+        if pd.notna(label) and 'CONSOLIDATED' in str(label).upper():
             consolidated_row = idx + 3
             break
     
     if consolidated_row is None:
         g_matrix = np.zeros((num_criteria, num_objectives))
     else:
-        g_matrix = []
-        for c in range(num_criteria):
-            row_data = []
-            for o in range(num_objectives):
-                value = df_repr.iloc[consolidated_row + c, 1 + o]
-                row_data.append(int(value) if pd.notna(value) else 0)
-            g_matrix.append(row_data)
-        g_matrix = np.array(g_matrix)
+        block = df_repr.iloc[consolidated_row:consolidated_row + num_criteria, 1:1 + num_objectives].to_numpy()
+        g_matrix = np.where(pd.isna(block), 0, block).astype(int)
     
+    # nonzero() on the transpose walks objective by objective, criteria ascending within each
+    obj_idx, crit_idx = np.nonzero(g_matrix.T == 1)
     obj_map = {}
-    for o in range(num_objectives):
-        obj_idx = o + 1
-        criteria_in_obj = [i + 1 for i in range(num_criteria) if g_matrix[i, o] == 1]
-        if criteria_in_obj:
-            obj_map[obj_idx] = criteria_in_obj
+    for o, i in zip((obj_idx + 1).tolist(), (crit_idx + 1).tolist()):
+        obj_map.setdefault(o, []).append(i)
     
     results['g_matrix'] = g_matrix.tolist()
     results['obj_map'] = obj_map
@@ -1146,32 +846,24 @@ def read_mcdm_template(file):
     results['I'] = I
     results['O'] = O
     
-    c = {i: results['c_values'][i-1] for i in I}
-    u = {i: results['u_values'][i-1] for i in I}
-    m = {i: results['m_values'][i-1] for i in I}
-    s = {i: results['s_values'][i-1] for i in I}
-    ce = {i: results['ce_values'][i-1] for i in I}
-    a = {i: results['a_values'][i-1] for i in I}
-    cc = {i: results['cc_values'][i-1] for i in I}
-    q = {i: results['q_values'][i-1] for i in I}
+    # Per-criterion scores stay as arrays indexed by i - 1; the model reads them positionally
+    for key in ('c', 'm', 's', 'ce', 'a', 'cc'):
+        values = np.asarray(results[f'{key}_values'], dtype=float)
+        results[key] = values
+        results[f'tot_{key}'] = float(values.sum())
+        results[f'{key}_norm'] = values / results[f'tot_{key}']
     
-    results['c'] = c
+    u = np.asarray(results['u_values'], dtype=int)
     results['u'] = u
-    results['m'] = m
-    results['s'] = s
-    results['ce'] = ce
-    results['a'] = a
-    results['cc'] = cc
-    results['q'] = q
-    
-    gamma = {i: results['gamma_O']*u[i] + results['gamma_S']*(1 - u[i]) for i in I}
-    tau = {i: results['tau_O']*u[i] + results['tau_S']*(1 - u[i]) for i in I}
-    results['gamma'] = gamma
-    results['tau'] = tau
-    
-    pairs = [(i, k) for i in I for k in I if i < k]
-    r_mat = results['r_mat']
-    r = {(i, k): r_mat[i-1][k-1] for (i, k) in pairs}
+    results['q'] = np.asarray(results['q_values'], dtype=int)
+    results['gamma'] = results['gamma_O'] * u + results['gamma_S'] * (1 - u)
+    results['tau'] = results['tau_O'] * u + results['tau_S'] * (1 - u)
+    
+    upper_i, upper_k = np.triu_indices(num_criteria, k=1)
+    pairs = list(zip((upper_i + 1).tolist(), (upper_k + 1).tolist()))
+    r_vals = pooled_corr[upper_i, upper_k]
+    r = dict(zip(pairs, r_vals.tolist()))
+    results['r_vals'] = r_vals
     results['pairs'] = pairs
     results['r'] = r
     
@@ -1191,19 +883,20 @@ def read_mcdm_template(file):
     D = {o: max(1, Io_dict[o] - U[o]) for o in O}
     results['D'] = D
     
-    results['tot_c'] = sum(c.values())
-    results['tot_m'] = sum(m.values())
-    results['tot_s'] = sum(s.values())
-    results['tot_ce'] = sum(ce.values())
-    results['tot_a'] = sum(a.values())
-    results['tot_cc'] = sum(cc.values())
-    results['tot_r'] = sum(r.values())
+    results['tot_r'] = float(r_vals.sum())
     
     results['M_big'] = 10000.0
     results['eps'] = 1e-6
     
     return results
 
+# Keyed on the uploaded bytes, so extracting the same workbook again skips the parse;
+# cache_data hands out a fresh copy each time, leaving the cached results untouched
+@st.cache_data(show_spinner=False, max_entries=8)
+def read_uploaded_template(file_bytes):
+    """Read an uploaded MCDM template from its raw bytes (cached per file content)"""
+    return read_mcdm_template(io.BytesIO(file_bytes))
+
 
 # ================================================================
 # OPTIMIZATION MODEL - COMPLETE
@@ -1212,6 +905,9 @@ def read_mcdm_template(file):
 def build_mcdm_model(data, weights):
     """Build Pyomo optimization model"""
     
+    import pyomo.environ as pyo
+    from pyomo.core.expr import LinearExpression
+    
     M = pyo.ConcreteModel()
     
     I = data['I']
@@ -1225,11 +921,10 @@ def build_mcdm_model(data, weights):
     ce = data['ce']
     a = data['a']
     cc = data['cc']
-    q = data['q']
+    q = data['q'].tolist()
     
     gamma = data['gamma']
     tau = data['tau']
-    r = data['r']
     g = data['g']
     e_rp = data['e_rp_dict']
     Io = data['Io_dict']
@@ -1245,29 +940,34 @@ def build_mcdm_model(data, weights):
     omega = data['omega']
     zeta = data['zeta']
     
-    tot_c = data['tot_c']
-    tot_m = data['tot_m']
-    tot_s = data['tot_s']
-    tot_ce = data['tot_ce']
-    tot_a = data['tot_a']
-    tot_cc = data['tot_cc']
+    r_vals = data['r_vals']
     tot_r = data['tot_r']
     
+    c_norm = data['c_norm']
+    m_norm = data['m_norm']
+    s_norm = data['s_norm']
+    ce_norm = data['ce_norm']
+    a_norm = data['a_norm']
+    cc_norm = data['cc_norm']
+    
     M_big = data['M_big']
     eps = data['eps']
     
-    w1 = weights['w1']
-    w2 = weights['w2']
-    w3 = weights['w3']
-    w4 = weights['w4']
-    w5_minus = weights['w5_minus']
-    w5_plus = weights['w5_plus']
-    w6 = weights['w6']
-    w7 = weights['w7']
-    w8 = weights['w8']
-    w9 = weights['w9']
-    w11_minus = weights['w11_minus']
-    w11_plus = weights['w11_plus']
+    # Weights are mutable parameters so a built model can be re-weighted without rebuilding it
+    M.w = pyo.Param(list(weights), mutable=True, initialize=weights)
+    
+    w1 = M.w['w1']
+    w2 = M.w['w2']
+    w3 = M.w['w3']
+    w4 = M.w['w4']
+    w5_minus = M.w['w5_minus']
+    w5_plus = M.w['w5_plus']
+    w6 = M.w['w6']
+    w7 = M.w['w7']
+    w8 = M.w['w8']
+    w9 = M.w['w9']
+    w11_minus = M.w['w11_minus']
+    w11_plus = M.w['w11_plus']
     
     M.I = pyo.Set(initialize=I)
     M.O = pyo.Set(initialize=O)
@@ -1299,42 +999,41 @@ def build_mcdm_model(data, weights):
     M.do2_minus = pyo.Var(M.O, domain=pyo.NonNegativeIntegers)
     M.do2_plus = pyo.Var(M.O, domain=pyo.NonNegativeIntegers)
     
-    M.comp1 = pyo.Constraint(M.I, rule=lambda M, i: c[i] - alpha <= M_big * M.yc[i] - eps)
-    M.comp2 = pyo.Constraint(M.I, rule=lambda M, i: c[i] - alpha >= -M_big * (1 - M.yc[i]) - eps)
-    M.comp3 = pyo.Constraint(M.I, rule=lambda M, i: M.x[i] <= M.yc[i])
+    # Big-M screen per step: y_i is 1 exactly when the score clears its threshold, and x_i needs y_i.
+    # The constant side of both big-M rows is folded into a bound for all criteria at once, so each
+    # rule returns a (lower, body, upper) tuple of plain floats instead of building a relational expression
+    def add_screen(name, y, gap, upper_offset, lower_offset):
+        lower = (gap - upper_offset).tolist()
+        upper = (gap + M_big - lower_offset).tolist()
+        M.add_component(f'{name}1', pyo.Constraint(M.I, rule=lambda M, i: (lower[i-1], M_big * y[i], None)))
+        M.add_component(f'{name}2', pyo.Constraint(M.I, rule=lambda M, i: (None, M_big * y[i], upper[i-1])))
+        M.add_component(f'{name}3', pyo.Constraint(M.I, rule=lambda M, i: M.x[i] <= y[i]))
     
-    M.N_def = pyo.Constraint(expr=M.N == sum(M.x[i] for i in M.I))
-    sum_u = float(sum(u.values()))
-    M.rho_def = pyo.Constraint(expr=M.rho * sum_u == sum(u[i] * M.x[i] for i in M.I))
+    add_screen('comp', M.yc, c - alpha, -eps, -eps)
     
-    M.meas1 = pyo.Constraint(M.I, rule=lambda M, i: m[i] - gamma[i] <= M_big * M.ym[i] - eps)
-    M.meas2 = pyo.Constraint(M.I, rule=lambda M, i: m[i] - gamma[i] >= -M_big * (1 - M.ym[i]) - eps)
-    M.meas3 = pyo.Constraint(M.I, rule=lambda M, i: M.x[i] <= M.ym[i])
-    
-    M.sens1 = pyo.Constraint(M.I, rule=lambda M, i: s[i] - theta <= M_big * M.ys[i])
-    M.sens2 = pyo.Constraint(M.I, rule=lambda M, i: s[i] - theta >= eps - M_big * (1 - M.ys[i]))
-    M.sens3 = pyo.Constraint(M.I, rule=lambda M, i: M.x[i] <= M.ys[i])
-    
-    M.cost1 = pyo.Constraint(M.I, rule=lambda M, i: ce[i] - tau[i] <= M_big * M.yce[i] - eps)
-    M.cost2 = pyo.Constraint(M.I, rule=lambda M, i: ce[i] - tau[i] >= -M_big * (1 - M.yce[i]) - eps)
-    M.cost3 = pyo.Constraint(M.I, rule=lambda M, i: M.x[i] <= M.yce[i])
-    
-    M.align1 = pyo.Constraint(M.I, rule=lambda M, i: a[i] - lam <= M_big * M.ya[i] - eps)
-    M.align2 = pyo.Constraint(M.I, rule=lambda M, i: a[i] - lam >= -M_big * (1 - M.ya[i]) - eps)
-    M.align3 = pyo.Constraint(M.I, rule=lambda M, i: M.x[i] <= M.ya[i])
-    
-    M.cog1 = pyo.Constraint(M.I, rule=lambda M, i: cc[i] - mu <= M_big * M.ycc[i] - eps)
-    M.cog2 = pyo.Constraint(M.I, rule=lambda M, i: cc[i] - mu >= -M_big * (1 - M.ycc[i]) - eps)
-    M.cog3 = pyo.Constraint(M.I, rule=lambda M, i: M.x[i] <= M.ycc[i])
-    
-    M.dist1 = pyo.Constraint(M.P, rule=lambda M, i, k: r[(i, k)] - delta <= M_big * M.h[(i, k)] - eps)
-    M.dist2 = pyo.Constraint(M.P, rule=lambda M, i, k: r[(i, k)] - delta >= -M_big * (1 - M.h[(i, k)]) - eps)
+    M.N_def = pyo.Constraint(expr=M.N == sum(M.x[i] for i in M.I))
+    sum_u = float(u.sum())
+    M.rho_def = pyo.Constraint(expr=M.rho * sum_u == LinearExpression(constant=0, linear_coefs=u.tolist(),
+                                                                       linear_vars=[M.x[i] for i in M.I]))
+    
+    add_screen('meas', M.ym, m - gamma, -eps, -eps)
+    add_screen('sens', M.ys, s - theta, 0.0, eps)
+    add_screen('cost', M.yce, ce - tau, -eps, -eps)
+    add_screen('align', M.ya, a - lam, -eps, -eps)
+    add_screen('cog', M.ycc, cc - mu, -eps, -eps)
+    
+    # Same folding for the pairwise big-M rows, the largest constraint families in the model
+    r_gap = r_vals - delta
+    dist1_lower = dict(zip(pairs, (r_gap + eps).tolist()))
+    dist2_upper = dict(zip(pairs, (r_gap + M_big + eps).tolist()))
+    M.dist1 = pyo.Constraint(M.P, rule=lambda M, i, k: (dist1_lower[(i, k)], M_big * M.h[(i, k)], None))
+    M.dist2 = pyo.Constraint(M.P, rule=lambda M, i, k: (None, M_big * M.h[(i, k)], dist2_upper[(i, k)]))
     M.dist3 = pyo.Constraint(M.P, rule=lambda M, i, k: M.x[i] + M.x[k] <= 2 - M.h[(i, k)])
     
     M.par1 = pyo.Constraint(expr=M.N + M.d1_minus - M.d1_plus == omega)
     M.par2 = pyo.Constraint(expr=M.N + M.d2_minus - M.d2_plus == zeta)
     
-    M.mono = pyo.Constraint(M.I, rule=lambda M, i: M.x[i] <= q[i])
+    M.mono = pyo.Constraint(M.I, rule=lambda M, i: M.x[i] <= q[i-1])
     
     M.rep_count = pyo.Constraint(M.O, rule=lambda M, o: M.n[o] == sum(g[(i, o)] * M.x[i] for i in M.I))
     M.coverage = pyo.Constraint(M.O, rule=lambda M, o: M.n[o] >= 1)
@@ -1348,19 +1047,16 @@ def build_mcdm_model(data, weights):
     
     O_card = len(O)
     
-    benefit = sum(
-        (
-            w1 * (c[i] / tot_c) +
-            w3 * (m[i] / tot_m) +
-            w6 * (s[i] / tot_s) +
-            w7 * (ce[i] / tot_ce) +
-            w8 * (a[i] / tot_a) +
-            w9 * (cc[i] / tot_cc)
-        ) * M.x[i]
-        for i in M.I
-    )
+    # Linear terms are assembled directly from coefficient vectors, skipping the generic sum() builder
+    def linear_sum(coefs, variables):
+        return LinearExpression(constant=0, linear_coefs=coefs.tolist(), linear_vars=variables)
     
-    redundancy_pen = w4 * (sum(r[(i, k)] * M.t[(i, k)] for (i, k) in M.P) / tot_r)
+    x_vars = [M.x[i] for i in M.I]
+    benefit = (w1 * linear_sum(c_norm, x_vars) + w3 * linear_sum(m_norm, x_vars)
+               + w6 * linear_sum(s_norm, x_vars) + w7 * linear_sum(ce_norm, x_vars)
+               + w8 * linear_sum(a_norm, x_vars) + w9 * linear_sum(cc_norm, x_vars))
+    
+    redundancy_pen = w4 * linear_sum(r_vals / tot_r, [M.t[p] for p in M.P])
     parsimony_pen = (w5_minus * (M.d1_minus / omega)) + (w5_plus * (M.d2_plus / (len(I) - zeta)))
     rep_pen = (
         w11_minus * (sum(M.do1_minus[o] / L[o] for o in M.O) / O_card)
@@ -1375,12 +1071,66 @@ def build_mcdm_model(data, weights):
     return M
 
 
+def data_fingerprint(data):
+    """Content digest of an extracted dataset"""
+    return hashlib.blake2b(pickle.dumps(data), digest_size=16).hexdigest()
+
+
+def get_model_and_solver(data, weights, data_key):
+    """Build the model and its solver once per extracted dataset; later calls only update the weights"""
+    cached = st.session_state.get('_model_cache')
+    if cached is not None and cached[0] == data_key:
+        _, model, solver, gap_option = cached
+        for key, value in weights.items():
+            model.w[key] = value
+        return model, solver, gap_option
+    
+    # The HiGHS interfaces are persistent: they keep the loaded instance and on later solves
+    # of the same model only push the changed weight parameters
+    model = build_mcdm_model(data, weights)
+    solver, gap_option = pick_solver()
+    st.session_state['_model_cache'] = (data_key, model, solver, gap_option)
+    return model, solver, gap_option
+
+
+def solve_model(model, solver, gap_option, mip_gap, time_limit):
+    """Solve the selection model, loading a solution only when the solver returned one"""
+    from pyomo.opt import TerminationCondition
+    
+    # The cached model still holds the previous solution, which stays feasible when only the
+    # weights change, so capable solvers get it as a MIP start
+    warm = {'warmstart': True} if solver.warm_start_capable() else {}
+    # Solutions are loaded by hand: the HiGHS interfaces raise instead of returning an
+    # infeasible or time-limit status when asked to load a solution that does not exist
+    result = solver.solve(model, tee=False, load_solutions=False, timelimit=time_limit,
+                          options={gap_option: mip_gap}, **warm)
+    if (result.solver.termination_condition in (TerminationCondition.optimal, TerminationCondition.feasible,
+                                                TerminationCondition.maxTimeLimit)
+            and len(result.solution) > 0):
+        model.solutions.load_from(result)
+    return result
+
+
+# Supported solvers in order of preference, each with the name of its relative MIP gap option.
+# appsi_highs comes first because, unlike the newer "highs" interface, it accepts a MIP start
+_SOLVER_GAP_OPTIONS = {
+    "appsi_highs": "mip_rel_gap",
+    "highs": "mip_rel_gap",
+    "cbc": "ratioGap",
+    "glpk": "mipgap",
+}
+
 def pick_solver():
-    """Select available solver"""
-    for name in ("cbc", "highs", "glpk"):
+    """Select available solver, returned with its MIP gap option name"""
+    import pyomo.environ  # registers the solver plugins with SolverFactory
+    from pyomo.opt import SolverFactory
+    
+    # The HiGHS interfaces solve in-process through highspy; cbc and glpk shell out
+    # through an intermediate model file, so they are only fallbacks
+    for name, gap_option in _SOLVER_GAP_OPTIONS.items():
         s = SolverFactory(name)
         if s.available(False):
-            return s
+            return s, gap_option
     raise RuntimeError("No MILP solver found")
 
 
@@ -1388,6 +1138,16 @@ def pick_solver():
 # UI HELPER FUNCTIONS
 # ================================================================
 
+def metrics_html(pairs, columns):
+    """Metric cards for (label, value) pairs laid out as a single CSS grid"""
+    cards = "".join(
+        f'<div class="metric-card"><div class="metric-label">{label}</div>'
+        f'<div class="metric-value">{value}</div></div>'
+        for label, value in pairs
+    )
+    return f'<div class="metric-grid" style="grid-template-columns: repeat({columns}, 1fr);">{cards}</div>'
+
+
 def show_progress_indicator(current_step):
     """Display progress indicator"""
     
@@ -1467,10 +1227,45 @@ def show_navigation_buttons(current_step):
                 st.rerun()
 
 
+@st.fragment
+def show_sidebar():
+    """Problem summary and quick navigation"""
+    
+    st.markdown("### 📊 Problem Information")
+    
+    if st.session_state.data:
+        data = st.session_state.data
+        st.markdown(metrics_html([
+            ("Criteria", data['num_criteria']), ("Alternatives", data['num_alternatives']),
+            ("Experts", data['num_experts']), ("Objectives", data['num_objectives'])
+        ], columns=2), unsafe_allow_html=True)
+    else:
+        st.info("Upload data to see problem details")
+    
+    st.markdown("---")
+    
+    st.markdown("### 🧭 Quick Navigation")
+    if st.button("📝 Step 1: Generate", use_container_width=True, type="secondary"):
+        st.session_state.current_step = 1
+        st.rerun()
+    if st.button("📤 Step 2: Upload", use_container_width=True, type="secondary"):
+        st.session_state.current_step = 2
+        st.rerun()
+    if st.button("⚖️ Step 3: Weights", use_container_width=True, type="secondary", disabled=not st.session_state.data):
+        st.session_state.current_step = 3
+        st.rerun()
+    if st.button("🚀 Step 4: Optimize", use_container_width=True, type="secondary", disabled=not st.session_state.weights):
+        st.session_state.current_step = 4
+        st.rerun()
+
+
 # ================================================================
 # STEP 1: GENERATE TEMPLATE
 # ================================================================
 
+# Steps 1 and 4 only change state that nothing outside the page reads, so their inputs
+# and buttons rerun just the page body instead of the sidebar and progress header too
+@st.fragment
 def show_step1_generate_template():
     st.header("📝 Step 1: Generate Excel Template")
     st.markdown("Configure your problem parameters and generate a customized Excel template.")
@@ -1511,7 +1306,25 @@ def show_step1_generate_template():
         if st.button("🎨 Generate Excel Template", type="primary", use_container_width=True):
             with st.spinner("Generating template..."):
                 try:
-                    buffer = generate_excel_template(
+                    st.session_state.config = {
+                        'num_criteria': int(num_criteria),
+                        'num_alternatives': int(num_alternatives),
+                        'num_experts': int(num_experts),
+                        'num_objectives': int(num_objectives),
+                        'omega': int(omega),
+                        'zeta': int(zeta),
+                        'alpha': alpha,
+                        'gamma_O': gamma_O,
+                        'gamma_S': gamma_S,
+                        'delta': delta,
+                        'theta': theta,
+                        'tau_O': tau_O,
+                        'tau_S': tau_S,
+                        'lambda': lambda_th,
+                        'mu': mu
+                    }
+                    
+                    template_bytes = generate_excel_template(
                         int(num_criteria), int(num_alternatives), int(num_experts), int(num_objectives),
                         int(omega), int(zeta), alpha, gamma_O, gamma_S, delta, theta,
                         tau_O, tau_S, lambda_th, mu
@@ -1519,11 +1332,14 @@ def show_step1_generate_template():
                     
                     st.success("✅ Template generated successfully!")
                     
+                    # Deferred data hands the cached bytes to the media file manager only on click; "ignore"
+                    # skips the rerun so the button and its pending download stay on the page
                     st.download_button(
                         label="📥 Download Excel Template",
-                        data=buffer,
+                        data=lambda: template_bytes,
                         file_name=f"MCDM_Template_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
                         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        on_click="ignore",
                         use_container_width=True,
                         type="primary"
                     )
@@ -1547,6 +1363,8 @@ def show_step1_generate_template():
 # ================================================================
 
 def show_step2_upload_extract():
+    import pandas as pd
+    
     st.header("📤 Step 2: Upload Filled Template")
     st.markdown("Upload your completed Excel template to extract the data.")
     
@@ -1558,7 +1376,7 @@ def show_step2_upload_extract():
             if st.button("🔍 Extract Data", type="primary", use_container_width=True):
                 with st.spinner("Reading Excel file..."):
                     try:
-                        data = read_mcdm_template(uploaded_file)
+                        data = read_uploaded_template(uploaded_file.getvalue())
                         st.session_state.data = data
                         
                         st.markdown("""
@@ -1567,11 +1385,10 @@ def show_step2_upload_extract():
                         </div>
                         """, unsafe_allow_html=True)
                         
-                        col1, col2, col3, col4 = st.columns(4)
-                        col1.metric("Criteria", data['num_criteria'])
-                        col2.metric("Alternatives", data['num_alternatives'])
-                        col3.metric("Experts", data['num_experts'])
-                        col4.metric("Objectives", data['num_objectives'])
+                        st.markdown(metrics_html([
+                            ("Criteria", data['num_criteria']), ("Alternatives", data['num_alternatives']),
+                            ("Experts", data['num_experts']), ("Objectives", data['num_objectives'])
+                        ], columns=4), unsafe_allow_html=True)
                         
                         with st.expander("📋 View Criteria", expanded=True):
                             criteria_df = pd.DataFrame({
@@ -1582,9 +1399,13 @@ def show_step2_upload_extract():
                             st.dataframe(criteria_df, use_container_width=True, hide_index=True)
                         
                         with st.expander(" View Objectives"):
-                            for i, name in enumerate(data['objectives_names'], 1):
-                                criteria_in_obj = data['obj_map'].get(i, [])
-                                st.write(f"**O{i}: {name}** → Criteria: {criteria_in_obj}")
+                            objectives_df = pd.DataFrame({
+                                'ID': [f"O{i+1}" for i in range(data['num_objectives'])],
+                                'Name': data['objectives_names'],
+                                'Criteria': [", ".join(f"C{c}" for c in data['obj_map'].get(i + 1, []))
+                                             for i in range(data['num_objectives'])]
+                            })
+                            st.dataframe(objectives_df, use_container_width=True, hide_index=True)
                         
                         st.info("✅ Ready! Click 'Next' to set weights.")
                         
@@ -1596,35 +1417,71 @@ def show_step2_upload_extract():
 # STEP 3: SET WEIGHTS
 # ================================================================
 
-def show_step3_set_weights():
-    st.header("⚖️ Step 3: Swing Weighting")
-    
-    if not st.session_state.data:
-        st.warning("⚠️ Please upload and extract data first!")
-        return
-    
-    st.markdown("""
-    <div class="info-box">
-        <strong>💡 How to use:</strong><br>
-        Adjust the sliders to indicate the importance of each component (0.0 to 1.0).<br>
-        Weights will be automatically normalized to sum to 1.0.
-    </div>
-    """, unsafe_allow_html=True)
+# Objective weight components as key -> (name, description, default slider value)
+_WEIGHT_COMPONENTS = {
+    'w1': ('Completeness', 'How well criteria cover decision aspects', 0.10),
+    'w2': ('Objectivity', 'Proportion of objective vs subjective criteria', 0.10),
+    'w3': ('Measurability', 'How easily criteria can be quantified', 0.10),
+    'w4': ('Distinctiveness', 'Penalty for highly correlated criteria', 0.10),
+    'w5_minus': ('Parsimony Lower', 'Penalty for having too few criteria', 0.05),
+    'w6': ('Sensitivity', 'Impact of criteria on decision outcomes', 0.10),
+    'w7': ('Cost-Effectiveness', 'Resource efficiency of criteria', 0.10),
+    'w8': ('Alignment', 'How well criteria align with objectives', 0.10),
+    'w9': ('Cognitive Coherence', 'Clarity and consistency of definitions', 0.10),
+    'w5_plus': ('Parsimony Upper', 'Penalty for having too many criteria', 0.05),
+    'w11_minus': ('Representativeness Min', 'Penalty for insufficient coverage', 0.05),
+    'w11_plus': ('Representativeness Max', 'Penalty for excessive coverage', 0.05)
+}
+_WEIGHT_KEYS = tuple(_WEIGHT_COMPONENTS)
+
+# One markdown element for the whole column instead of one per component; repeated
+# weight vectors (e.g. re-applying unchanged sliders) reuse the rendered HTML
+@st.cache_data(show_spinner=False, max_entries=64)
+def weight_cards_html(sorted_weights, weight_sum):
+    """HTML for the normalized-weight cards and their sum"""
+    cards = []
+    for comp_key, weight in sorted_weights:
+        comp_name = _WEIGHT_COMPONENTS[comp_key][0]
+        percentage = weight * 100
+        
+        if weight >= 0.10:
+            color = "#667eea"
+        elif weight >= 0.05:
+            color = "#f59e0b"
+        else:
+            color = "#6b7280"
+        
+        cards.append(f"""
+        <div style="background: white; padding: 0.75rem; border-radius: 8px; 
+                    border-left: 4px solid {color}; margin-bottom: 0.5rem;
+                    box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
+            <div style="display: flex; justify-content: space-between; align-items: center;">
+                <div>
+                    <div style="font-weight: 600; color: #1f2937;">{comp_name}</div>
+                    <div style="font-size: 0.875rem; color: #6b7280;">{comp_key}</div>
+                </div>
+                <div style="text-align: right;">
+                    <div style="font-size: 1.5rem; font-weight: 700; color: {color};">
+                        {weight:.4f}
+                    </div>
+                    <div style="font-size: 0.75rem; color: #10b981;">
+                        ↑ {percentage:.1f}%
+                    </div>
+                </div>
+            </div>
+        </div>""")
     
-    components = {
-        'w1': ('Completeness', 'How well criteria cover decision aspects', 0.10),
-        'w2': ('Objectivity', 'Proportion of objective vs subjective criteria', 0.10),
-        'w3': ('Measurability', 'How easily criteria can be quantified', 0.10),
-        'w4': ('Distinctiveness', 'Penalty for highly correlated criteria', 0.10),
-        'w5_minus': ('Parsimony Lower', 'Penalty for having too few criteria', 0.05),
-        'w6': ('Sensitivity', 'Impact of criteria on decision outcomes', 0.10),
-        'w7': ('Cost-Effectiveness', 'Resource efficiency of criteria', 0.10),
-        'w8': ('Alignment', 'How well criteria align with objectives', 0.10),
-        'w9': ('Cognitive Coherence', 'Clarity and consistency of definitions', 0.10),
-        'w5_plus': ('Parsimony Upper', 'Penalty for having too many criteria', 0.05),
-        'w11_minus': ('Representativeness Min', 'Penalty for insufficient coverage', 0.05),
-        'w11_plus': ('Representativeness Max', 'Penalty for excessive coverage', 0.05)
-    }
+    cards.append(f"""
+        <div style="background: #f3f4f6; padding: 1rem; border-radius: 8px; margin-top: 1rem;">
+            <strong>Sum:</strong> {weight_sum:.10f}
+        </div>
+        """)
+    return "".join(cards)
+
+@st.fragment
+def show_weight_panel():
+    """Display weight sliders and normalized weights"""
+    import numpy as np
     
     col1, col2 = st.columns([2, 1])
     
@@ -1632,68 +1489,56 @@ def show_step3_set_weights():
         st.subheader("Adjust Component Weights")
         raw_weights = {}
         
-        for comp_key, (comp_name, comp_desc, default_val) in components.items():
-            slider_key = f"weight_{comp_key}"
-            if slider_key not in st.session_state:
-                st.session_state[slider_key] = default_val
+        # Inside a form, dragging a slider no longer reruns the panel; all twelve values commit together on Apply
+        with st.form("weights_form", border=False):
+            for comp_key, (comp_name, comp_desc, default_val) in _WEIGHT_COMPONENTS.items():
+                slider_key = f"weight_{comp_key}"
+                if slider_key not in st.session_state:
+                    st.session_state[slider_key] = default_val
+                
+                value = st.slider(
+                    f"**{comp_name}**",
+                    min_value=0.0,
+                    max_value=1.0,
+                    value=st.session_state[slider_key],
+                    step=0.01,
+                    key=slider_key,
+                    help=comp_desc
+                )
+                raw_weights[comp_key] = value
             
-            value = st.slider(
-                f"**{comp_name}**",
-                min_value=0.0,
-                max_value=1.0,
-                value=st.session_state[slider_key],
-                step=0.01,
-                key=slider_key,
-                help=comp_desc
-            )
-            raw_weights[comp_key] = value
-    
-    total = sum(raw_weights.values()) or 1
-    normalized = {k: v / total for k, v in raw_weights.items()}
+            st.form_submit_button("Apply Weights", type="primary", use_container_width=True)
+    
+    values = np.fromiter((raw_weights[k] for k in _WEIGHT_KEYS), dtype=float, count=len(_WEIGHT_KEYS))
+    raw_total = values.sum()
+    values /= raw_total or 1.0
+    normalized = dict(zip(_WEIGHT_KEYS, values.tolist()))
+    weight_sum = 1.0 if raw_total else 0.0
     st.session_state.weights = normalized
     
     with col2:
         st.subheader("Normalized Weights")
         
-        sorted_weights = sorted(normalized.items(), key=lambda x: x[1], reverse=True)
-        
-        for comp_key, weight in sorted_weights:
-            comp_name = components[comp_key][0]
-            percentage = weight * 100
-            
-            if weight >= 0.10:
-                color = "#667eea"
-            elif weight >= 0.05:
-                color = "#f59e0b"
-            else:
-                color = "#6b7280"
-            
-            st.markdown(f"""
-            <div style="background: white; padding: 0.75rem; border-radius: 8px; 
-                        border-left: 4px solid {color}; margin-bottom: 0.5rem;
-                        box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
-                <div style="display: flex; justify-content: space-between; align-items: center;">
-                    <div>
-                        <div style="font-weight: 600; color: #1f2937;">{comp_name}</div>
-                        <div style="font-size: 0.875rem; color: #6b7280;">{comp_key}</div>
-                    </div>
-                    <div style="text-align: right;">
-                        <div style="font-size: 1.5rem; font-weight: 700; color: {color};">
-                            {weight:.4f}
-                        </div>
-                        <div style="font-size: 0.75rem; color: #10b981;">
-                            ↑ {percentage:.1f}%
-                        </div>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.markdown(f"""
-        <div style="background: #f3f4f6; padding: 1rem; border-radius: 8px; margin-top: 1rem;">
-            <strong>Sum:</strong> {sum(normalized.values()):.10f}
-        </div>
-        """, unsafe_allow_html=True)
+        sorted_weights = tuple(sorted(normalized.items(), key=lambda x: x[1], reverse=True))
+        st.markdown(weight_cards_html(sorted_weights, weight_sum), unsafe_allow_html=True)
+
+
+def show_step3_set_weights():
+    st.header("⚖️ Step 3: Swing Weighting")
+    
+    if not st.session_state.data:
+        st.warning("⚠️ Please upload and extract data first!")
+        return
+    
+    st.markdown("""
+    <div class="info-box">
+        <strong>💡 How to use:</strong><br>
+        Adjust the sliders to indicate the importance of each component (0.0 to 1.0), then click Apply Weights.<br>
+        Weights will be automatically normalized to sum to 1.0.
+    </div>
+    """, unsafe_allow_html=True)
+    
+    show_weight_panel()
     
     st.success("✅ Weights configured! Click 'Next' to run optimization.")
 
@@ -1702,68 +1547,90 @@ def show_step3_set_weights():
 # STEP 4: RUN OPTIMIZATION
 # ================================================================
 
+@st.fragment
 def show_step4_run_optimization():
+    import numpy as np
+    import pyomo.environ as pyo
+    from pyomo.opt import TerminationCondition
+    
     st.header("🚀 Step 4: Run Optimization")
     
     if not st.session_state.data or not st.session_state.weights:
         st.warning("⚠️ Please complete previous steps first!")
         return
     
+    # The solver stops once the incumbent is within the relative gap of the best bound, or at the time limit
+    col1, col2 = st.columns(2)
+    mip_gap = col1.number_input("Relative MIP gap", min_value=0.0, max_value=1.0, value=0.01,
+                                step=0.005, format="%.3f", key="mip_gap")
+    time_limit = col2.number_input("Time limit (seconds)", min_value=1, value=60, step=10, key="time_limit")
+    
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
         if st.button(" Run Optimization", type="primary", use_container_width=True):
             with st.spinner("Building and solving optimization model..."):
                 try:
-                    model = build_mcdm_model(st.session_state.data, st.session_state.weights)
-                    solver = pick_solver()
-                    result = solver.solve(model, tee=False)
-                    
-                    st.session_state.model = model
-                    st.session_state.result = result
+                    # Re-running with unchanged data, weights and solver settings replays the last solve
+                    data_key = data_fingerprint(st.session_state.data)
+                    solve_key = (data_key, tuple(st.session_state.weights.items()), mip_gap, time_limit)
+                    if st.session_state.get('_last_solve_key') == solve_key:
+                        model = st.session_state.model
+                        result = st.session_state.result
+                    else:
+                        st.session_state['_last_solve_key'] = None
+                        model, solver, gap_option = get_model_and_solver(st.session_state.data,
+                                                                         st.session_state.weights, data_key)
+                        result = solve_model(model, solver, gap_option, mip_gap, time_limit)
+                        
+                        st.session_state.model = model
+                        st.session_state.result = result
+                        st.session_state['_last_solve_key'] = solve_key
                     
-                    if result.solver.termination_condition == TerminationCondition.optimal:
-                        st.markdown("""
-                        <div class="success-box">
-                            <strong>✅ Optimization completed successfully!</strong>
-                        </div>
-                        """, unsafe_allow_html=True)
+                    termination = result.solver.termination_condition
+                    if termination in (TerminationCondition.optimal, TerminationCondition.feasible,
+                                       TerminationCondition.maxTimeLimit) and len(result.solution) > 0:
+                        if termination == TerminationCondition.optimal:
+                            st.markdown("""
+                            <div class="success-box">
+                                <strong>✅ Optimization completed successfully!</strong>
+                            </div>
+                            """, unsafe_allow_html=True)
+                        else:
+                            st.warning("⏱️ Time limit reached; showing the best solution found.")
                         
                         data = st.session_state.data
                         I = data['I']
-                        x_val = {i: float(pyo.value(model.x[i])) for i in I}
-                        selected = [i for i in I if x_val[i] > 0.5]
+                        # Variables hold plain floats after the solve, so read them directly in index order
+                        x_arr = np.fromiter((v.value for v in model.x.values()), dtype=float, count=len(I))
+                        selected = (np.flatnonzero(x_arr > 0.5) + 1).tolist()
+                        rho_val = float(model.rho.value)
+                        obj_val = float(pyo.value(model.obj))
                         
                         col1, col2, col3 = st.columns(3)
                         col1.metric("Selected Criteria", f"{len(selected)}/{len(I)}")
-                        col2.metric("Objectivity Ratio (ρ)", f"{float(pyo.value(model.rho)):.4f}")
-                        col3.metric("Objective Value", f"{float(pyo.value(model.obj)):.6f}")
+                        col2.metric("Objectivity Ratio (ρ)", f"{rho_val:.4f}")
+                        col3.metric("Objective Value", f"{obj_val:.6f}")
                         
                         st.subheader("✅ Selected Criteria")
-                        selected_df = pd.DataFrame({
-                            'ID': [f"C{i}" for i in selected],
-                            'Name': [data['criteria_names'][i-1] for i in selected],
-                            'Type': [data['criteria_types'][i-1] for i in selected]
-                        })
-                        st.dataframe(selected_df, use_container_width=True, hide_index=True)
+                        selected_rows = [
+                            {'ID': f"C{i}", 'Name': data['criteria_names'][i-1], 'Type': data['criteria_types'][i-1]}
+                            for i in selected
+                        ]
+                        st.dataframe(selected_rows, use_container_width=True, hide_index=True)
                         
                         with st.expander("📊 View Detailed Results"):
                             st.markdown("### Objective Breakdown")
                             
-                            c, m, s, ce, a, cc = data['c'], data['m'], data['s'], data['ce'], data['a'], data['cc']
-                            tot_c, tot_m, tot_s = data['tot_c'], data['tot_m'], data['tot_s']
-                            tot_ce, tot_a, tot_cc = data['tot_ce'], data['tot_a'], data['tot_cc']
-                            
                             weights = st.session_state.weights
                             w1, w2, w3, w6, w7, w8, w9 = weights['w1'], weights['w2'], weights['w3'], weights['w6'], weights['w7'], weights['w8'], weights['w9']
                             
-                            term_w1 = w1 * sum((c[i] / tot_c) * x_val[i] for i in I)
-                            term_w3 = w3 * sum((m[i] / tot_m) * x_val[i] for i in I)
-                            term_w6 = w6 * sum((s[i] / tot_s) * x_val[i] for i in I)
-                            term_w7 = w7 * sum((ce[i] / tot_ce) * x_val[i] for i in I)
-                            term_w8 = w8 * sum((a[i] / tot_a) * x_val[i] for i in I)
-                            term_w9 = w9 * sum((cc[i] / tot_cc) * x_val[i] for i in I)
+                            term_w1 = w1 * float(data['c_norm'] @ x_arr)
+                            term_w3 = w3 * float(data['m_norm'] @ x_arr)
+                            term_w6 = w6 * float(data['s_norm'] @ x_arr)
+                            term_w7 = w7 * float(data['ce_norm'] @ x_arr)
+                            term_w8 = w8 * float(data['a_norm'] @ x_arr)
+                            term_w9 = w9 * float(data['cc_norm'] @ x_arr)
                             
-                            rho_val = float(pyo.value(model.rho))
                             term_w2 = w2 * rho_val
                             
                             st.write("**Positive Components:**")
@@ -1775,6 +1642,8 @@ def show_step4_run_optimization():
                             st.write(f"- Alignment: {term_w8:.6f}")
                             st.write(f"- Cognitive Coherence: {term_w9:.6f}")
                         
+                    elif termination == TerminationCondition.maxTimeLimit:
+                        st.error("⏱️ Time limit reached before any feasible selection was found; raise the time limit.")
                     else:
                         st.error("❌ No optimal solution found. Consider relaxing thresholds.")
                         
@@ -1795,34 +1664,7 @@ def main():
     st.markdown("---")
     
     with st.sidebar:
-        st.markdown("### 📊 Problem Information")
-        
-        if st.session_state.data:
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Criteria", st.session_state.data['num_criteria'])
-                st.metric("Experts", st.session_state.data['num_experts'])
-            with col2:
-                st.metric("Alternatives", st.session_state.data['num_alternatives'])
-                st.metric("Objectives", st.session_state.data['num_objectives'])
-        else:
-            st.info("Upload data to see problem details")
-        
-        st.markdown("---")
-        
-        st.markdown("### 🧭 Quick Navigation")
-        if st.button("📝 Step 1: Generate", use_container_width=True, type="secondary"):
-            st.session_state.current_step = 1
-            st.rerun()
-        if st.button("📤 Step 2: Upload", use_container_width=True, type="secondary"):
-            st.session_state.current_step = 2
-            st.rerun()
-        if st.button("⚖️ Step 3: Weights", use_container_width=True, type="secondary", disabled=not st.session_state.data):
-            st.session_state.current_step = 3
-            st.rerun()
-        if st.button("🚀 Step 4: Optimize", use_container_width=True, type="secondary", disabled=not st.session_state.weights):
-            st.session_state.current_step = 4
-            st.rerun()
+        show_sidebar()
     
     if st.session_state.current_step == 1:
         show_step1_generate_template()